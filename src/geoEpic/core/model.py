@@ -1,14 +1,102 @@
 import os
 import shutil
 import subprocess
+import stat
 # from glob import glob
 # import pandas as pd
-import numpy as np
-from geoEpic.io import ConfigParser
 import platform
-from geoEpic.utils import FileLockHandle
+from geoEpic.utils import FileLockHandle, IS_WINDOWS
 from datetime import datetime
 from weakref import finalize
+import mmap
+from collections import deque, OrderedDict
+from types import MappingProxyType
+from tqdm import tqdm
+import time
+import atexit
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+_IS_LINUX = platform.system() == 'Linux'
+
+# Background deletion of finished run directories, as (owner pid, executor)
+_CLEANUP_POOL = (None, None)
+_TRASH_IDS = itertools.count()
+
+
+def _cleanup_pool():
+    """Return this process's run directory deletion pool, creating it on first use."""
+    global _CLEANUP_POOL
+    pid, pool = _CLEANUP_POOL
+    # A pool inherited through fork has no threads, start a new one
+    if pid != os.getpid():
+        pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='epic-cleanup')
+        _CLEANUP_POOL = (os.getpid(), pool)
+    return pool
+
+# Field positions on the first line of EPICCONT.DAT
+_EC_FIELDS = {'duration': 0, 'year': 1, 'month': 2, 'day': 3}
+
+def _replace_fields(line, updates):
+    """
+    Replace whitespace separated fields of a line in a single pass, keeping the column layout.
+    Each new value is right aligned into the width of the old field and its leading whitespace,
+    so all other columns are left byte-for-byte untouched. EPIC reads these lines list-directed,
+    so a value always keeps at least one separating space, one that does not fit shifts the rest
+    of the line.
+
+    Args:
+        line (str): A line of an EPIC input file.
+        updates (dict): New field text keyed by field index.
+
+    Returns:
+        str: The updated line.
+    """
+    body = line.rstrip('\r\n')
+    parts, field, pos, end = [], 0, 0, len(body)
+    while pos < end:
+        start = pos
+        while pos < end and body[pos].isspace(): pos += 1
+        while pos < end and not body[pos].isspace(): pos += 1
+        chunk = body[start:pos]
+        if field in updates and not chunk.isspace():
+            text = updates[field]
+            chunk = ' ' + text.rjust(len(chunk) - 1) if len(text) < len(chunk) else ' ' + text
+        parts.append(chunk)
+        field += 1
+    return ''.join(parts) + line[len(body):]
+
+def _patch_file(path, old_lines, new_lines):
+    """
+    Write new_lines to a text file whose current contents are old_lines.
+
+    When every line keeps its length, only the changed lines are patched in place through mmap,
+    otherwise the whole file is rewritten.
+
+    Args:
+        path (str): Path to the file.
+        old_lines (list of str or None): Current lines of the file, None if unknown.
+        new_lines (list of str): Lines to write, with their line endings.
+    """
+    if old_lines and len(old_lines) == len(new_lines):
+        old_bytes = [line.encode() for line in old_lines]
+        new_bytes = [line.encode() for line in new_lines]
+        size = sum(map(len, old_bytes))
+        if size and all(len(old) == len(new) for old, new in zip(old_bytes, new_bytes)):
+            with open(path, 'r+b') as file:
+                # Only patch when the file still matches the lines it was read as
+                if os.fstat(file.fileno()).st_size == size:
+                    with mmap.mmap(file.fileno(), 0) as mm:
+                        offset = 0
+                        for old, new in zip(old_bytes, new_bytes):
+                            if old != new:
+                                mm[offset:offset + len(new)] = new
+                            offset += len(old)
+                        mm.flush()
+                    return
+    with open(path, 'w', newline='') as file:
+        file.writelines(new_lines)
 
 class EPICModel:
     """
@@ -24,6 +112,8 @@ class EPICModel:
         output_types (list): A list of enabled output types for the EPIC model.
         model_dir (str): Directory path where the executable is located.
         executable_name (str): Name of the executable file.
+        delete_after_run (bool): Delete the site run directory and log after a successful run.
+        reuse_run_dirs (bool): Keep one run directory per worker and only refresh per-site files between runs.
     """
 
     # Class attributes for line numbers
@@ -34,6 +124,30 @@ class EPICModel:
     EC_IRR = 3    # Line number for irrigation settings in the EPICCONT.DAT file
     EC_NIT = 4    # Line number for nitrogen settings in the EPICCONT.DAT file
 
+    # Site list files (EPICFILE.DAT keys) written for each site run
+    _SITE_FILE_KEYS = ('FSITE', 'FSOIL', 'FWLST', 'FWPM1', 'FWIND', 'FOPSC')
+    # Databases EPIC only reads (EPICFILE.DAT keys), hardlinked into run directories with the executable.
+    # Every other template file is copied, since EPIC may write to it during a run
+    _READ_ONLY_FILE_KEYS = ('FWPM5', 'FWIDX', 'FCROP', 'FTILL', 'FPEST', 'FFERT', 'FTR55', 'FPARM', 'FMLRN')
+
+    # Contents of the per-site configuration files written by _writeDATFiles
+    _TPL_RUN = '{site_id} 1  0  0  0  1  1  1/'
+    _TPL_FILE = '1    "./{name}"\n'
+    _TPL_WLST = '1    1.DLY\n'
+    _TPL_WPM1 = '1    1.WP1   {lat:.2f}   {lon:.2f}    {ele:.2f}\n'
+    _TPL_WIND = '1    1.WND   {lat:.2f}   {lon:.2f}    {ele:.2f}\n'
+
+    # Translation table blanking the '*' separators on the print file extension lines
+    _PF_EXT_TABLE = str.maketrans('*', ' ')
+
+    # Parsed EPICFILE.DAT contents keyed by (model_dir, mtime_ns)
+    _FILE_NAMES_CACHE = {}
+
+    # Weather files written by DLY.save and DLY.to_monthly, linked into each run directory
+    _WEATHER_FILES = ('1.DLY', '1.WP1', '1.WND')
+    # Number of generated weather file sets kept in cache_path/WTH
+    _WEATHER_CACHE_SIZE = 256
+
     def __init__(self, path_to_executable):
         """
         Initialize an EPICModel instance with the path to the executable model.
@@ -50,31 +164,66 @@ class EPICModel:
         self._duration = None
         self.output_dir = os.path.dirname(self._model_dir)
         self.log_dir = os.path.dirname(self._model_dir)
+        self._print_file_state = None
+        self._epiccont_cache = None
+        self._epiccont_stat = None
+        self._epiccont_header = None
+        self._weather_cache = OrderedDict()
+        self._weather_count = 0
+        self._weather_lock = threading.Lock()
         # Load file names from EPICFILE.DAT
         self._load_file_names()
+        self._scan_template()
         self.get_output_types()
 
-        if platform.system() != "Windows":
-            # On Unix-like systems, use chmod to make the file executable
-            subprocess.Popen(f'chmod +x {self.executable}', shell=True).wait()
-
-        # Define the path to the RAM-backed filesystem
-        self.cache_path = os.path.join(self.base_dir, '.cache')#'/dev/shm'  # On Linux systems
-        # Delete Site Simulation folder in cache after runs
+        if not IS_WINDOWS:
+            # On Unix-like systems, make the file executable if it is not already
+            mode = os.stat(self.executable).st_mode
+            exec_bits = stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH
+            if mode & exec_bits != exec_bits:
+                os.chmod(self.executable, mode | exec_bits)
+
+        # Use the RAM-backed filesystem for run directories when available (Linux), EPIC_SCRATCH overrides it
+        if os.environ.get('EPIC_SCRATCH'):
+            self.cache_path = os.path.abspath(os.environ['EPIC_SCRATCH'])
+        elif _IS_LINUX and os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+            self.cache_path = f'/dev/shm/epic_{os.getuid()}'
+        else:
+            self.cache_path = os.path.join(self.base_dir, '.cache')
+        # Delete Site Simulation folder in cache after runs, kept folders use RAM when the cache is on /dev/shm
         self.delete_after_run = True
+        # Reuse one run directory per process (and concurrent run) instead of cloning the model per site
+        self.reuse_run_dirs = False
         
-        # Automatically acquire the lock when the instance is created
+        # Hold the model directory for the lifetime of the instance, setup() and the settings
+        # setters write the template files that every run is cloned from
         self._model_lock = FileLockHandle(self._model_dir)
         self._model_lock.acquire()
-        
+
         # Use weakref finalizer instead of __del__
         self._finalizer = finalize(self, self.close)
         
     def close(self):
-        """Release the lock on the model's directory by deleting the lock file."""
-        self._model_lock.release()
+        """Release the lock on the model's directory, further access to the model directory raises an error."""
+        if self._model_lock is not None:
+            self._model_lock.release()
         self._model_dir = None
 
+    def __getstate__(self):
+        # The lock file handle and finalizer stay with the owning process
+        state = self.__dict__.copy()
+        state['_model_lock'] = None
+        state['_finalizer'] = None
+        state['_weather_cache'] = OrderedDict()
+        # Mapping proxies and locks cannot be pickled
+        state['file_names'] = dict(self.file_names)
+        state['_weather_lock'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._weather_lock = threading.Lock()
+
     def __enter__(self):
         return self
 
@@ -87,6 +236,17 @@ class EPICModel:
             raise RuntimeError("Model closed or not initialized.")
         return self._model_dir
 
+    @property
+    def cache_path(self):
+        """Directory where the site run directories are created."""
+        return self._cache_path
+
+    @cache_path.setter
+    def cache_path(self, value):
+        self._cache_path = value
+        # Joined once here instead of on every run
+        self._epicruns_dir = os.path.join(value, 'EPICRUNS')
+
     @property
     def start_date(self):
         """
@@ -95,14 +255,7 @@ class EPICModel:
         Returns:
             datetime: The start date of the simulation.
         """
-        epiccont_path = os.path.join(self.model_dir, 'EPICCONT.DAT')
-        with open(epiccont_path, 'r') as file:
-            line = file.readline()
-            values = line.split()
-            year = int(values[1])
-            month = int(values[2])
-            day = int(values[3])
-            self._start_date = datetime(year, month, day)
+        self._duration, self._start_date = self._read_epiccont_header()
         return self._start_date
 
     @start_date.setter
@@ -114,26 +267,7 @@ class EPICModel:
             value (datetime or str): The new start date to set. If a string is provided,
                                      it should be in the format 'YYYY-MM-DD'.
         """
-        if isinstance(value, str):
-            try:
-                value = datetime.strptime(value, '%Y-%m-%d')
-            except ValueError:
-                raise ValueError("Invalid date string. Please use the format 'YYYY-MM-DD'.")
-        
-        if not isinstance(value, datetime):
-            raise TypeError("Start date must be a datetime object or a string in 'YYYY-MM-DD' format.")
-        
-        self._start_date = value
-        epiccont_path = os.path.join(self.model_dir, 'EPICCONT.DAT')
-        with open(epiccont_path, 'r+') as file:
-            lines = file.readlines()
-            values = lines[0].split()
-            values[1] = f"{value.year:4d}"
-            values[2] = f"{value.month:2d}"
-            values[3] = f"{value.day:2d}"
-            lines[0] = ' '.join(values) + '\n'
-            file.seek(0)
-            file.writelines(lines)
+        self._apply_epiccont(self._read_epiccont(), start_date=value, write=True)
 
     @property
     def duration(self):
@@ -143,11 +277,7 @@ class EPICModel:
         Returns:
             int: The duration of the simulation in years.
         """
-        epiccont_path = os.path.join(self.model_dir, 'EPICCONT.DAT')
-        with open(epiccont_path, 'r') as file:
-            line = file.readline()
-            values = line.split()
-            self._duration = int(values[0])
+        self._duration, self._start_date = self._read_epiccont_header()
         return self._duration
 
     @duration.setter
@@ -158,15 +288,99 @@ class EPICModel:
         Args:
             value (int): The new duration to set in years.
         """
-        self._duration = value
+        self._apply_epiccont(self._read_epiccont(), duration=value, write=True)
+
+    @staticmethod
+    def _parse_date(value):
+        """Convert a 'YYYY-MM-DD' string or datetime into a datetime object."""
+        if isinstance(value, str):
+            try:
+                value = datetime.strptime(value, '%Y-%m-%d')
+            except ValueError:
+                raise ValueError("Invalid date string. Please use the format 'YYYY-MM-DD'.")
+        
+        if not isinstance(value, datetime):
+            raise TypeError("Start date must be a datetime object or a string in 'YYYY-MM-DD' format.")
+        return value
+
+    def _load_epiccont(self):
+        """Refresh the cached lines of EPICCONT.DAT if the file changed since it was last read"""
         epiccont_path = os.path.join(self.model_dir, 'EPICCONT.DAT')
-        with open(epiccont_path, 'r+') as file:
-            lines = file.readlines()
+        st = os.stat(epiccont_path)
+        fingerprint = (st.st_mtime_ns, st.st_size)
+        if self._epiccont_stat != fingerprint:
+            with open(epiccont_path, 'r', newline='') as file:
+                self._epiccont_cache = file.readlines()
+            self._epiccont_stat = fingerprint
+        return self._epiccont_cache
+
+    def _read_epiccont(self):
+        """Read the lines of EPICCONT.DAT, reusing the cached lines while the file is unchanged"""
+        return list(self._load_epiccont())
+
+    def _read_epiccont_header(self):
+        """
+        Read the simulation duration and start date from the first line of EPICCONT.DAT,
+        parsing it once per version of the file.
+
+        Returns:
+            tuple: The duration in years and the start date.
+        """
+        lines = self._load_epiccont()
+        if self._epiccont_header is None or self._epiccont_header[0] != self._epiccont_stat:
             values = lines[0].split()
-            values[0] = f" {value:3d}"
-            lines[0] = ' '.join(values) + '\n'
-            file.seek(0)
-            file.writelines(lines)
+            duration = int(values[_EC_FIELDS['duration']])
+            start_date = datetime(*(int(values[_EC_FIELDS[key]]) for key in ('year', 'month', 'day')))
+            self._epiccont_header = (self._epiccont_stat, duration, start_date)
+        return self._epiccont_header[1:]
+
+    def _write_epiccont(self, lines):
+        """Write the lines of EPICCONT.DAT and keep them as the cached contents"""
+        epiccont_path = os.path.join(self.model_dir, 'EPICCONT.DAT')
+        st = os.stat(epiccont_path)
+        cached = self._epiccont_cache if self._epiccont_stat == (st.st_mtime_ns, st.st_size) else None
+        _patch_file(epiccont_path, cached, lines)
+        st = os.stat(epiccont_path)
+        self._epiccont_cache = list(lines)
+        self._epiccont_stat = (st.st_mtime_ns, st.st_size)
+
+    def _apply_epiccont(self, lines, start_date=None, duration=None, irr=None, nit=None, write=False):
+        """
+        Apply updates to the lines of EPICCONT.DAT in memory, optionally writing them back once.
+
+        Args:
+            lines (list of str): Lines of EPICCONT.DAT as returned by _read_epiccont.
+            start_date (datetime or str, optional): New simulation start date.
+            duration (int, optional): New simulation duration in years.
+            irr (dict, optional): Irrigation values keyed by their position on the EC_IRR line.
+            nit (dict, optional): Nitrogen values keyed by their position on the EC_NIT line.
+            write (bool, optional): Write the updated lines to EPICCONT.DAT. Defaults to False.
+
+        Returns:
+            list of str: The updated lines.
+        """
+        if start_date is not None or duration is not None:
+            updates = {}
+            if duration is not None:
+                self._duration = duration
+                updates[_EC_FIELDS['duration']] = f"{duration:d}"
+            if start_date is not None:
+                start_date = self._parse_date(start_date)
+                self._start_date = start_date
+                updates[_EC_FIELDS['year']] = f"{start_date.year:d}"
+                updates[_EC_FIELDS['month']] = f"{start_date.month:d}"
+                updates[_EC_FIELDS['day']] = f"{start_date.day:d}"
+            lines[0] = _replace_fields(lines[0], updates)
+
+        for line_no, updates, name in ((self.EC_IRR, irr, 'irrigation'), (self.EC_NIT, nit, 'nitrogen')):
+            if not updates: continue
+            if len(lines) < line_no + 1:
+                raise ValueError(f"File does not have enough lines to update {name} parameters.")
+            lines[line_no] = _replace_fields(lines[line_no], {i: f"{value:.2f}" for i, value in updates.items()})
+
+        if write:
+            self._write_epiccont(lines)
+        return lines
 
     @property
     def output_types(self):
@@ -176,17 +390,30 @@ class EPICModel:
         Returns:
             list: A list of enabled output types.
         """
-        return self.get_output_types()
+        return self._output_types
 
     def get_output_types(self):
-        print_file_path = os.path.join(self.model_dir, self.file_names['FPRNT'])
-        with open(print_file_path, 'r') as file:
-            lines = file.readlines()
-        exts = lines[self.PF_EXT1].replace('*', ' ').strip().split() + lines[self.PF_EXT2].replace('*', ' ').strip().split()
-        toggles = lines[self.PF_TOG1].strip().split() + lines[self.PF_TOG2].strip().split()
+        _, exts, toggles, _ = self._parse_print_file()
         self._output_types = [ext.upper() for ext, toggle in zip(exts, toggles) if toggle == '1']
         return self._output_types
 
+    def _parse_print_file(self):
+        """
+        Parse the print file (FPRNT), re-reading it only when its modification time changes.
+
+        Returns:
+            tuple: The file lines, output extensions, output toggles and the number of toggles on the first toggle line.
+        """
+        print_file_path = os.path.join(self.model_dir, self.file_names['FPRNT'])
+        mtime = os.stat(print_file_path).st_mtime_ns
+        if self._print_file_state is None or self._print_file_state[0] != mtime:
+            with open(print_file_path, 'r', newline='') as file:
+                lines = file.readlines()
+            exts = (lines[self.PF_EXT1] + lines[self.PF_EXT2]).translate(self._PF_EXT_TABLE).split()
+            toggles1 = lines[self.PF_TOG1].split()
+            self._print_file_state = (mtime, lines, exts, toggles1 + lines[self.PF_TOG2].split(), len(toggles1))
+        return self._print_file_state[1:]
+
     @output_types.setter
     def output_types(self, value):
         """
@@ -198,15 +425,16 @@ class EPICModel:
         self.set_output_types(value)
 
     def _load_file_names(self):
-        """Load file names from EPICFILE.DAT"""
-        self.file_names = {}
+        """Load file names from EPICFILE.DAT, parsing it once per model directory and modification time"""
         epicfile_path = os.path.join(self.model_dir, 'EPICFILE.DAT')
-        with open(epicfile_path, 'r') as f:
-            lines = f.readlines()
-        for line in lines:
-            parts = line.split()
-            if len(parts) == 2:
-                self.file_names[parts[0]] = parts[1]
+        key = (self.model_dir, os.stat(epicfile_path).st_mtime_ns)
+        file_names = EPICModel._FILE_NAMES_CACHE.get(key)
+        if file_names is None:
+            with open(epicfile_path, 'r') as f:
+                # Shared by all instances on this model directory, so handed out read-only
+                file_names = MappingProxyType(dict(parts for parts in map(str.split, f) if len(parts) == 2))
+            EPICModel._FILE_NAMES_CACHE[key] = file_names
+        self.file_names = file_names
 
     def setup(self, config):
         """
@@ -215,8 +443,10 @@ class EPICModel:
         Args:
             config (dict): Configuration dictionary containing model settings.
         """
-        self.start_date = config.get('start_date', self.start_date)
-        self.duration = config.get('duration', self.duration)
+        # Update start date and duration with a single read and write of EPICCONT.DAT
+        start_date, duration = config.get('start_date'), config.get('duration')
+        if start_date is not None or duration is not None:
+            self._apply_epiccont(self._read_epiccont(), start_date=start_date, duration=duration, write=True)
         self.output_dir = os.path.abspath(config.get('output_dir', self.output_dir))
         self.log_dir = os.path.abspath(config.get('log_dir', self.log_dir))
         if self.output_dir:
@@ -236,11 +466,11 @@ class EPICModel:
         Returns:
             EPICModel: A configured instance of the EPICModel.
         """
+        from geoEpic.io import ConfigParser
         config = ConfigParser(config_path)
         instance = cls(config['EPICModel'])
         instance.base_dir = os.path.abspath(config.dir)
         instance.setup(config)
-        instance.set_output_types(config['output_types'])
         return instance
 
     def set_output_types(self, output_types):
@@ -249,108 +479,466 @@ class EPICModel:
 
         Args:
             output_types (list of str): List of output types to be enabled.
+
+        Raises:
+            ValueError: If an output type is not listed in the print file.
         """
-        self._output_types = output_types
+        outputs_to_enable = set(' '.join(output_types).lower().split())
+        lines, exts, current_toggles, split1_len = self._parse_print_file()
+        unknown = outputs_to_enable - {ext.lower() for ext in exts}
+        if unknown:
+            raise ValueError(f"Unknown output types: {', '.join(sorted(t.upper() for t in unknown))}. "
+                             f"Available types: {', '.join(ext.upper() for ext in exts)}")
+
+        toggles = ['1' if ext.lower() in outputs_to_enable else '0' for ext in exts]
+        self._output_types = [ext.upper() for ext, toggle in zip(exts, toggles) if toggle == '1']
+        # Nothing to write if the print file already has these outputs enabled
+        if toggles == current_toggles:
+            return
+
+        new_lines = list(lines)
+        for line_no, line_toggles in ((self.PF_TOG1, toggles[:split1_len]), (self.PF_TOG2, toggles[split1_len:])):
+            ending = lines[line_no][len(lines[line_no].rstrip('\r\n')):]
+            new_lines[line_no] = '   ' + '   '.join(line_toggles) + ending
         print_file_path = os.path.join(self.model_dir, self.file_names['FPRNT'])
-        outputs_to_enable = ' '.join(output_types).lower().split()
-        with open(print_file_path, 'r') as file:
-            lines = file.readlines()
-
-        exts = lines[self.PF_EXT1].replace('*', ' ').strip().split() + lines[self.PF_EXT2].replace('*', ' ').strip().split()
-        toggles = lines[self.PF_TOG1].strip().split() + lines[self.PF_TOG2].strip().split()
-
-        for i, ext in enumerate(exts):
-            toggles[i] = '1' if ext in outputs_to_enable else '0'
+        _patch_file(print_file_path, lines, new_lines)
+        # Keep the parsed state in step with the file, the next read needs no re-parse
+        self._print_file_state = (os.stat(print_file_path).st_mtime_ns, new_lines, exts, toggles, split1_len)
 
-        lines[self.PF_TOG1] = '   ' + '   '.join(toggles[:len(lines[self.PF_TOG1].strip().split())]) + '\n'
-        lines[self.PF_TOG2] = '   ' + '   '.join(toggles[len(lines[self.PF_TOG1].strip().split()):]) + '\n'
-        with open(print_file_path, 'w') as file:
-            file.writelines(lines)
-
-    def run(self, site, verbose = True, dest = None):
+    def run(self, site, verbose = True, dest = None, timeout = None):
         """
         Execute the model for the given site and handle output files.
 
         Args:
             site (Site): A site instance containing site-specific configuration.
             dest (str, optional): Destination directory for the run. If None, a temporary directory is used.
+            timeout (int, optional): Number of seconds after which the run is terminated.
 
         Raises:
             Exception: If any output file is not generated or is empty.
+            TimeoutError: If the run takes longer than timeout.
         """
-        fid = site.site_id
-        dly = site.get_dly()
-        new_dir = os.path.join(self.cache_path, 'EPICRUNS', str(fid)) #if dest is None else dest
+        # Each thread gets its own directory when run directories are reused
+        new_dir = self._prepare_run(site, slot=threading.get_ident())
+        try:
+            process, log_file = self._launch(new_dir, site.site_id)
+            try:
+                process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+                raise TimeoutError(f"Execution timed out for site {site.site_id}")
+            self._finalize_run(site, new_dir, log_file, dest)
+        finally:
+            self._cleanup_run(new_dir)
 
-        if os.path.exists(new_dir):
-            shutil.rmtree(new_dir)
+    def _prepare_run(self, site, slot=0):
+        """
+        Create the run directory of a site and write its weather, site and configuration files.
+
+        Args:
+            site (Site): A site instance containing site-specific configuration.
+            slot (int, optional): Index of the concurrent run, selects the reused directory when reuse_run_dirs is set.
+
+        Returns:
+            str: Path to the run directory.
+        """
+        fid = site.site_id
+        weather_dir = self._weather_files(site)
+        if self.reuse_run_dirs:
+            new_dir = f"{self._epicruns_dir}{os.sep}w{os.getpid()}_{slot}"
+            self._reset_run_dir(new_dir)
+        else:
+            new_dir = self._epicruns_dir + os.sep + str(fid)
+            if os.path.exists(new_dir):
+                shutil.rmtree(new_dir)
+            self._clone_model_dir(new_dir)
 
-        shutil.copytree(self.model_dir, new_dir, ignore=lambda _, files: ['.lock'])
-        os.chdir(new_dir)
-        
         try:
-            # Prepare weather data
-            dly.save(1)
-            dly.to_monthly(1)
+            # Link the weather data generated for the site's DLY file
+            self._link_weather(weather_dir, new_dir)
             # copy virtual links and Write configuration files
-            self._writeDATFiles(site.copy('./'))
-            # Run EPIC executable
-            log_file = f"{fid}.log"
-            with open(log_file, 'w') as log:
-                process = subprocess.Popen([self.executable_name], stdin=subprocess.PIPE, stdout=log, stderr=log)
-                # Work Around for pause when error occurs.
-                while process.poll() is None:
-                    process.communicate(input=b'\n')
-            # Process output files
-            for out_type in self._output_types:
-                out_path = f'{fid}.{out_type}'
-                if not os.path.exists(out_path) or os.path.getsize(out_path) == 0:
-                    log_file_dst = os.path.join(self.log_dir, f"{fid}.log")
-                    shutil.move(log_file, log_file_dst)
-                    raise FileNotFoundError(f"Output file ({out_type}) not found or empty. \n Check {log_file_dst} for details")
-                dst = os.path.join(self.output_dir if dest is None else os.path.dirname(new_dir), out_path)
-                shutil.move(out_path, dst)
-                site.outputs[out_type] = dst
-        finally:
-            # Clean up
-            os.chdir(self.base_dir)
-            if self.delete_after_run or self.cache_path == '/dev/shm':
-                shutil.rmtree(new_dir)
+            self._writeDATFiles(site.copy(new_dir), new_dir)
+        except Exception:
+            self._cleanup_run(new_dir)
+            raise
+        return new_dir
 
-    def _writeDATFiles(self, site):
+    def _weather_files(self, site):
         """
-        Write configuration data files required for the model run.
+        Generate the daily and monthly weather files of a site, once per DLY file.
+
+        Sites sharing a weather grid cell reuse the files generated for the first of them, until the
+        DLY file changes or the entry is evicted from the cache.
 
         Args:
-            site (Site): A Site object for which data files are being prepared.
+            site (Site): The site whose weather files are needed.
+
+        Returns:
+            str: Directory holding the generated weather files.
+
+        Raises:
+            FileNotFoundError: If the DLY file of the site does not exist.
         """
-        with open('./EPICRUN.DAT', 'w') as ofile:
-            fmt = '%s 1  0  0  0  1  1  1/'%(site.site_id)
-            ofile.write(fmt)
+        try:
+            st = os.stat(site.dly_path)
+        except (TypeError, OSError):
+            raise FileNotFoundError(f"The DLY file at {site.dly_path} does not exist.")
+        key = (site.dly_path, st.st_mtime_ns, st.st_size)
+        with self._weather_lock:
+            weather_dir = self._weather_cache.get(key)
+            if weather_dir is not None and os.path.isdir(weather_dir):
+                self._weather_cache.move_to_end(key)
+                return weather_dir
+            owner_dir = os.path.join(self.cache_path, 'WTH', f'{os.getpid()}_{id(self)}')
+            if not os.path.isdir(owner_dir):
+                atexit.register(shutil.rmtree, owner_dir, True)
+            self._weather_count += 1
+            weather_dir = os.path.join(owner_dir, str(self._weather_count))
+
+        # Generated outside the lock so threads on other weather files are not held up
+        shutil.rmtree(weather_dir, ignore_errors=True)
+        os.makedirs(weather_dir)
+        try:
+            dly = site.get_dly()
+            dly.save(os.path.join(weather_dir, '1'))
+            dly.to_monthly(os.path.join(weather_dir, '1'))
+        except Exception:
+            shutil.rmtree(weather_dir, ignore_errors=True)
+            raise
+
+        with self._weather_lock:
+            cached_dir = self._weather_cache.get(key)
+            if cached_dir is not None and os.path.isdir(cached_dir):
+                # Another thread generated the same files meanwhile, keep the cached ones
+                shutil.rmtree(weather_dir, ignore_errors=True)
+                return cached_dir
+            self._weather_cache[key] = weather_dir
+            if len(self._weather_cache) > self._WEATHER_CACHE_SIZE:
+                # Run directories keep their own links to the evicted files
+                _, evicted = self._weather_cache.popitem(last=False)
+                shutil.rmtree(evicted, ignore_errors=True)
+        return weather_dir
+
+    def _link_weather(self, weather_dir, new_dir):
+        """Hardlink the generated weather files into a run directory, copying them where links are not supported."""
+        for name in self._WEATHER_FILES:
+            src, dst = os.path.join(weather_dir, name), os.path.join(new_dir, name)
+            # Replace the template's copy rather than writing through a shared link
+            if os.path.lexists(dst):
+                os.remove(dst)
+            try:
+                os.link(src, dst)
+            except OSError:
+                shutil.copy2(src, dst)
 
-        with open(self.file_names['FSITE'], 'w') as ofile:
-            fmt = '1    "./%s"\n' % (os.path.basename(site.sit_path))
-            ofile.write(fmt)
+    def _launch(self, new_dir, fid):
+        """
+        Start the EPIC executable in a prepared run directory without waiting for it.
 
-        with open(self.file_names['FSOIL'], 'w') as ofile:
-            fmt = '1    "./%s"\n' % (os.path.basename(site.sol_path))
-            ofile.write(fmt)
+        Args:
+            new_dir (str): Path to the run directory.
+            fid (str): Site ID of the run.
 
-        with open(self.file_names['FWLST'], 'w') as ofile:
-            ofile.write('1    1.DLY\n')
+        Returns:
+            tuple: The running process and the path to its log file.
+        """
+        # Run EPIC executable, logging straight into log_dir
+        log_file = os.path.join(self.log_dir, f"{fid}.log")
+        with open(log_file, 'wb', buffering=0) as log:
+            executable = os.path.join(new_dir, self.executable_name)
+            process = subprocess.Popen([executable], cwd=new_dir, stdin=subprocess.PIPE, stdout=log, stderr=log)
+        # Work Around for pause when error occurs: feed newlines once and close stdin
+        try:
+            process.stdin.write(b'\n' * 8)
+            process.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        return process, log_file
 
-        with open(self.file_names['FWPM1'], 'w') as ofile:
-            fmt = '1    1.WP1   %.2f   %.2f    %.2f\n' % (site.latitude, site.longitude, site.elevation)
-            ofile.write(fmt)
-        
-        with open(self.file_names['FWIND'], 'w') as ofile:
-            fmt = '1    1.WND   %.2f   %.2f    %.2f\n' % (site.latitude, site.longitude, site.elevation)
-            ofile.write(fmt)
-            
-        with open(self.file_names['FOPSC'], 'w') as ofile:
-            fmt = '1    "./%s"\n' % (os.path.basename(site.opc_path))
-            ofile.write(fmt)
-    
+    def _finalize_run(self, site, new_dir, log_file, dest = None):
+        """
+        Check and move the output files of a finished run.
+
+        Args:
+            site (Site): The site that was simulated, its outputs are updated with the moved files.
+            new_dir (str): Path to the run directory.
+            log_file (str): Path to the log file of the run.
+            dest (str, optional): If set, outputs are kept next to the run directory instead of output_dir.
+
+        Raises:
+            FileNotFoundError: If any output file is not generated or is empty.
+        """
+        fid = site.site_id
+        out_dir = self.output_dir if dest is None else os.path.dirname(new_dir)
+        same_fs = os.stat(new_dir).st_dev == os.stat(out_dir).st_dev
+        # Sizes of the site's files in the run directory from a single directory scan
+        prefix = f'{fid}.'
+        with os.scandir(new_dir) as entries:
+            sizes = {entry.name: entry.stat().st_size for entry in entries if entry.name.startswith(prefix)}
+        for out_type in self._output_types:
+            out_name = f'{fid}.{out_type}'
+            out_path = os.path.join(new_dir, out_name)
+            if not sizes.get(out_name):
+                raise FileNotFoundError(f"Output file ({out_type}) not found or empty. \n Check {log_file} for details")
+            dst = os.path.join(out_dir, out_name)
+            self._move_file(out_path, dst, same_fs)
+            site.outputs[out_type] = dst
+        # Logs are only kept for failed runs
+        if self.delete_after_run:
+            os.remove(log_file)
+
+    def _reset_run_dir(self, new_dir):
+        """
+        Get a reusable run directory ready for the next site.
+
+        The directory is cloned from the template on first use and removed at exit. Later runs delete
+        everything the previous site left that is not part of the template and copy every template
+        file a run can write again, so the directory matches a fresh clone. The executable and
+        databases are only linked or copied again when the template file has changed since.
+
+        Args:
+            new_dir (str): Path to the reusable run directory.
+        """
+        if not os.path.isdir(new_dir):
+            self._clone_model_dir(new_dir)
+            atexit.register(shutil.rmtree, new_dir, True)
+            return
+        template_paths = {rel_path for rel_path, _, _ in self._template_entries}
+        for root, dirs, files in os.walk(new_dir):
+            rel_root = os.path.relpath(root, new_dir)
+            for name in list(dirs):
+                if os.path.normpath(os.path.join(rel_root, name)) not in template_paths:
+                    shutil.rmtree(os.path.join(root, name))
+                    dirs.remove(name)
+            for name in files:
+                if os.path.normpath(os.path.join(rel_root, name)) not in template_paths:
+                    os.remove(os.path.join(root, name))
+        # Any copied template file may have been changed by the previous run or by setup()
+        for rel_path, is_dir, is_read_only in self._template_entries:
+            src, dst = os.path.join(self.model_dir, rel_path), os.path.join(new_dir, rel_path)
+            if is_dir:
+                os.makedirs(dst, exist_ok=True)
+            elif rel_path in self._rewritten_files:
+                continue
+            elif not is_read_only:
+                # Replaced rather than overwritten, the old file may be a link
+                if os.path.lexists(dst):
+                    os.remove(dst)
+                shutil.copy2(src, dst)
+            else:
+                # Up to date when linked to the template file or a copy of its current version,
+                # edits to the template (ex: CROPCOM.DAT saved during calibration) must reach the run
+                src_st = os.stat(src)
+                try:
+                    dst_st = os.stat(dst)
+                except FileNotFoundError:
+                    dst_st = None
+                else:
+                    if ((dst_st.st_ino, dst_st.st_dev) == (src_st.st_ino, src_st.st_dev)
+                            or (dst_st.st_mtime_ns, dst_st.st_size) == (src_st.st_mtime_ns, src_st.st_size)):
+                        continue
+                    os.remove(dst)
+                try:
+                    os.link(src, dst)
+                except OSError:
+                    shutil.copy2(src, dst)
+
+    def _cleanup_run(self, new_dir):
+        """
+        Delete a run directory unless run directories are kept or reused.
+
+        The directory is renamed aside, so its name is free for the next run right away, and
+        deleted by a background thread off the run loop.
+        """
+        if self.reuse_run_dirs:
+            return
+        if self.delete_after_run:
+            trash_dir = f'{new_dir}.del{os.getpid()}_{next(_TRASH_IDS)}'
+            try:
+                os.rename(new_dir, trash_dir)
+            except OSError:
+                shutil.rmtree(new_dir, ignore_errors=True)
+                return
+            _cleanup_pool().submit(shutil.rmtree, trash_dir, True)
+
+    @staticmethod
+    def _move_file(src, dst, same_fs):
+        """
+        Move a file, renaming it in place on the same file system and copying it otherwise.
+
+        Args:
+            src (str): Path to the source file.
+            dst (str): Path to the destination file.
+            same_fs (bool): Whether src and dst are on the same file system.
+        """
+        if same_fs:
+            try:
+                os.replace(src, dst)
+                return
+            except OSError:
+                pass  # Same device but not renameable (ex: bind mounts), copy instead
+        shutil.copy2(src, dst)
+        os.remove(src)
+
+    def run_batch(self, sites, workers=None, timeout=None, bar=True):
+        """
+        Execute the model for multiple sites, keeping several EPIC processes running at once.
+
+        The next sites are prepared while earlier ones are still running, and each finished
+        run is finalized as soon as its process exits.
+
+        Args:
+            sites (list of Site): Sites to simulate. Each site runs in its own cache directory,
+                sites sharing a site_id run one after another.
+            workers (int, optional): Number of EPIC processes kept running. Defaults to os.cpu_count().
+            timeout (int, optional): Number of seconds after which a site run is terminated.
+            bar (bool, optional): Show a progress bar. Defaults to True.
+
+        Returns:
+            list: Indices of the sites for which the run failed.
+        """
+        sites = list(sites)
+        workers = workers or os.cpu_count()
+        pending = deque(range(len(sites)))
+        free_slots = list(range(workers))
+        running = {}
+        failed_indices = []
+        pbar = tqdm(total=len(sites)) if bar else None
+
+        def report(ind, exc):
+            print(f'\nExecution failed for site: {sites[ind].site_id}')
+            print(f'Exception: {exc}\n')
+            failed_indices.append(ind)
+            if pbar: pbar.update(1)
+
+        try:
+            while pending or running:
+                # Keep the process slots filled, one run per SiteID at a time since
+                # the log and output files are named after it
+                while pending and len(running) < workers:
+                    busy = {sites[i].site_id for i in running}
+                    ind = next((i for i in pending if sites[i].site_id not in busy), None)
+                    if ind is None:
+                        break
+                    pending.remove(ind)
+                    slot = free_slots.pop()
+                    try:
+                        new_dir = self._prepare_run(sites[ind], slot)
+                    except Exception as exc:
+                        free_slots.append(slot)
+                        report(ind, exc)
+                        continue
+                    try:
+                        process, log_file = self._launch(new_dir, sites[ind].site_id)
+                    except Exception as exc:
+                        free_slots.append(slot)
+                        self._cleanup_run(new_dir)
+                        report(ind, exc)
+                        continue
+                    running[ind] = (process, new_dir, log_file, time.monotonic(), slot)
+
+                # Finalize the runs that have exited
+                finished = False
+                for ind, (process, new_dir, log_file, start, slot) in list(running.items()):
+                    timed_out = False
+                    if process.poll() is None:
+                        if not timeout or time.monotonic() - start < timeout:
+                            continue
+                        timed_out = True
+                        process.kill()
+                        process.wait()
+                    finished = True
+                    del running[ind]
+                    free_slots.append(slot)
+                    try:
+                        if timed_out:
+                            raise TimeoutError("Execution timed out")
+                        self._finalize_run(sites[ind], new_dir, log_file)
+                        if pbar: pbar.update(1)
+                    except Exception as exc:
+                        report(ind, exc)
+                    finally:
+                        self._cleanup_run(new_dir)
+                if running and not finished:
+                    time.sleep(0.01)
+        finally:
+            # Stop anything still running on interrupts
+            for process, new_dir, _, _, _ in running.values():
+                process.kill()
+                process.wait()
+                self._cleanup_run(new_dir)
+            if pbar: pbar.close()
+        return failed_indices
+
+    def _scan_template(self):
+        """List the model directory once as (relative path, is directory, is read-only) entries."""
+        read_only = {self.executable_name} | {self.file_names[key] for key in self._READ_ONLY_FILE_KEYS
+                                              if key in self.file_names}
+        # Files written from scratch for every site are not cloned at all
+        self._rewritten_files = frozenset({'EPICRUN.DAT', *self._WEATHER_FILES}
+                                          | {self.file_names[key] for key in self._SITE_FILE_KEYS})
+        self._template_entries = []
+        for root, dirs, files in os.walk(self.model_dir):
+            rel_root = os.path.relpath(root, self.model_dir)
+            for name in dirs:
+                self._template_entries.append((os.path.normpath(os.path.join(rel_root, name)), True, False))
+            for name in files:
+                if name == '.lock': continue
+                rel_path = os.path.normpath(os.path.join(rel_root, name))
+                self._template_entries.append((rel_path, False, rel_path in read_only))
+
+    def _clone_model_dir(self, new_dir):
+        """
+        Clone the model directory into a run directory.
+
+        Only the executable and the databases EPIC reads without modifying are hardlinked to the
+        model directory, all other files are copied so a run can never write into the template.
+        Files written for each site (run, site list and weather files) are skipped. Falls back to
+        copying when hardlinks are not supported (ex: across file systems).
+
+        Args:
+            new_dir (str): Path of the run directory to create.
+        """
+        os.makedirs(new_dir)
+        link = True
+        for rel_path, is_dir, is_read_only in self._template_entries:
+            src, dst = os.path.join(self.model_dir, rel_path), os.path.join(new_dir, rel_path)
+            if is_dir:
+                os.mkdir(dst)
+                continue
+            if rel_path in self._rewritten_files:
+                continue
+            if link and is_read_only:
+                try:
+                    os.link(src, dst)
+                    continue
+                except OSError:
+                    link = False
+            shutil.copy2(src, dst)
+
+    def _writeDATFiles(self, site, run_dir):
+        """
+        Write configuration data files required for the model run.
+
+        Args:
+            site (Site): A Site object for which data files are being prepared.
+            run_dir (str): Run directory where the data files are written.
+        """
+        file_names, basename = self.file_names, os.path.basename
+        coords = {'lat': site.latitude, 'lon': site.longitude, 'ele': site.elevation}
+        payloads = (
+            ('EPICRUN.DAT', self._TPL_RUN.format(site_id=site.site_id)),
+            (file_names['FSITE'], self._TPL_FILE.format(name=basename(site.sit_path))),
+            (file_names['FSOIL'], self._TPL_FILE.format(name=basename(site.sol_path))),
+            (file_names['FWLST'], self._TPL_WLST),
+            (file_names['FWPM1'], self._TPL_WPM1.format_map(coords)),
+            (file_names['FWIND'], self._TPL_WIND.format_map(coords)),
+            (file_names['FOPSC'], self._TPL_FILE.format(name=basename(site.opc_path))),
+        )
+        for file_name, payload in payloads:
+            with open(os.path.join(run_dir, file_name), 'w') as file:
+                file.write(payload)
 
     def auto_irrigation(self, bir, efi=None, vimx=None, armn=None, armx=None):
         """
@@ -364,30 +952,9 @@ class EPICModel:
         :param armn: Minimum single application volume (ARMN) in mm - optional
         :param armx: Maximum single application volume (ARMX) in mm - optional
         """
-        epiccont_path = os.path.join(self.model_dir, 'EPICCONT.DAT')
-        with open(epiccont_path, 'r+') as file:
-            lines = file.readlines()
-            if len(lines) < self.EC_IRR + 1:
-                raise ValueError("File does not have enough lines to update irrigation parameters.")
-            
-            # Split existing line into list of values
-            values = lines[self.EC_IRR].split()
-            # Update mandatory BIR and optional parameters if provided
-            values[5] = f"{bir:6.2f}"
-            if efi is not None:
-                values[6] = f"{efi:6.2f}"
-            if vimx is not None:
-                values[7] = f"{vimx:6.2f}"
-            if armn is not None:
-                values[8] = f"{armn:6.2f}"
-            if armx is not None:
-                values[9] = f"{armx:6.2f}"
-            
-            # Join back into a single string
-            lines[self.EC_IRR] = '  ' + '  '.join([f"{float(v):6.2f}" for v in values]) + '\n'
-            
-            file.seek(0)
-            file.writelines(lines)
+        irr = {5: bir, 6: efi, 7: vimx, 8: armn, 9: armx}
+        irr = {i: v for i, v in irr.items() if v is not None}
+        self._apply_epiccont(self._read_epiccont(), irr=irr, write=True)
 
     def auto_Nfertilization(self, bft0, fnp=None, fmx=None):
         """
@@ -399,23 +966,6 @@ class EPICModel:
         :param fnp: Fertilizer application variable (FNP) - optional
         :param fmx: Maximum annual N fertilizer applied for a crop (FMX) - optional
         """
-        epiccont_path = os.path.join(self.model_dir, 'EPICCONT.DAT')
-        with open(epiccont_path, 'r+') as file:
-            lines = file.readlines()
-            if len(lines) < self.EC_NIT + 1:
-                raise ValueError("File does not have enough lines to update nitrogen parameters.")
-            
-            # Split existing line into list of values
-            values = lines[self.EC_NIT].split()
-            # Update mandatory BFT0 and optional parameters if provided
-            values[0] = f"{bft0:6.2f}"
-            if fnp is not None:
-                values[1] = f"{fnp:6.2f}"
-            if fmx is not None:
-                values[2] = f"{fmx:6.2f}"
-            
-            # Join back into a single string
-            lines[self.EC_NIT] = '  ' + '  '.join([f"{float(v):6.2f}" for v in values]) + '\n'
-            
-            file.seek(0)
-            file.writelines(lines)
+        nit = {0: bft0, 1: fnp, 2: fmx}
+        nit = {i: v for i, v in nit.items() if v is not None}
+        self._apply_epiccont(self._read_epiccont(), nit=nit, write=True)
@@ -1,5 +1,7 @@
 import os
 import shutil
+import stat
+import getpass
 import warnings
 import pandas as pd
 from functools import wraps
@@ -8,15 +10,82 @@ from geoEpic.utils import parallel_executor, filter_dataframe
 from .model import EPICModel
 from .site import Site
 import geopandas as gpd
-from glob import glob
 # from geoEpic.utils.redis import WorkerPool
 from shortuuid import uuid 
 import signal
+import threading
 from weakref import finalize
 # import subprocess
 # import platform
 from .calibration import PygmoProblem
-import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from tqdm import tqdm
+
+# Parse CSVs with the multithreaded pyarrow engine when pyarrow is installed (optional dependency)
+try:
+    import pyarrow
+    _CSV_OPTIONS = {'engine': 'pyarrow'}
+except ImportError:
+    _CSV_OPTIONS = {}
+
+# Validated site tables keyed by (path, mtime_ns, size), shared by the workspaces of a process
+_SITES_INFO_CACHE = OrderedDict()
+_SITES_INFO_CACHE_SIZE = 32
+
+
+def _load_sites_info(file_path):
+    """
+    Read and validate a CSV or SHP file of site information, reusing the result while the file is unchanged.
+
+    Args:
+        file_path (str): Path to the CSV or SHP file containing run information.
+
+    Returns:
+        pandas.DataFrame: A copy of the site table with 'lat' and 'lon' columns.
+
+    Raises:
+        ValueError: If the file format is unsupported or required columns are missing.
+    """
+    st = os.stat(file_path)
+    key = (os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
+    data = _SITES_INFO_CACHE.get(key)
+    if data is not None:
+        _SITES_INFO_CACHE.move_to_end(key)
+        return data.copy()
+
+    if file_path.lower().endswith('.csv'):
+        data = pd.read_csv(file_path, **_CSV_OPTIONS)
+        required_columns_csv = {'SiteID', 'soil', 'opc', 'dly', 'lat', 'lon'}
+        if not required_columns_csv.issubset(set(data.columns)):
+            raise ValueError("CSV file missing one or more required columns: 'SiteID', 'soil', 'opc', 'dly', 'lat', 'lon'")
+    elif file_path.lower().endswith('.shp'):
+        data = gpd.read_file(file_path)
+        data = data.to_crs(epsg=4326)  # Convert to latitude and longitude projection
+        # Centroids are computed once for both coordinates
+        centroids = data.geometry.centroid
+        data['lat'] = centroids.y
+        data['lon'] = centroids.x
+        required_columns_shp = {'SiteID', 'soil', 'opc', 'dly'}
+        if not required_columns_shp.issubset(set(data.columns)):
+            raise ValueError("Shapefile missing one or more required attributes: 'SiteID', 'soil', 'opc', 'dly'")
+        data.drop(columns=['geometry'], inplace=True)
+    else:
+        raise ValueError("Unsupported file format. Please provide a '.csv' or '.shp' file.")
+
+    _SITES_INFO_CACHE[key] = data
+    if len(_SITES_INFO_CACHE) > _SITES_INFO_CACHE_SIZE:
+        _SITES_INFO_CACHE.popitem(last=False)
+    return data.copy()
+
+
+def _force_remove(func, path, exc_info):
+    """shutil.rmtree error handler clearing the read-only flag (ex: on Windows) before retrying."""
+    if isinstance(exc_info[1], FileNotFoundError):
+        return
+    os.chmod(path, stat.S_IWRITE)
+    func(path)
+
 
 class Workspace:
     """
@@ -34,6 +103,9 @@ class Workspace:
         data_logger (DataLogger): Instance of the DataLogger for logging data.
     """
 
+    # Number of rows a logger routine buffers before they are written together
+    _LOG_BATCH_SIZE = 256
+
     def __init__(self, config_path, cache_path = None):
         """
         Initialize the Workspace with a configuration file.
@@ -53,19 +125,23 @@ class Workspace:
         self.model = EPICModel.from_config(config_path)
 
         # Create Cache folders on RAM or local storage
-        username = os.getlogin()
+        # getlogin needs a controlling terminal, getuser also works for services and batch jobs
+        username = getpass.getuser()
         if cache_path is None: 
             if os.path.exists('/dev/shm'): cache_path = '/dev/shm'
             else: cache_path = os.path.join(self.base_dir, '.cache')
         self.cache = os.path.join(cache_path, f'geo_epic_{username}', self.uuid)
         os.makedirs(self.cache, exist_ok=True)
         self.model.cache_path = self.cache
+        self._load_run_settings()
 
         # Process run info
         self._process_run_info(self.config['sites_info'])
 
-        # Initialise DataLogger
+        # Initialise DataLogger, rows of logger routines are buffered per routine and written in batches
         self.data_logger = DataLogger(self.cache)
+        self._log_buffers = {}
+        self._log_lock = threading.Lock()
 
         # Initialise Model pool
         # epicruns_dir = os.path.join(self.cache, 'EPICRUNS')
@@ -76,11 +152,19 @@ class Workspace:
             warning_msg = (f"Workers greater than number of CPU cores ({os.cpu_count()}).")
             warnings.warn(warning_msg, RuntimeWarning)
         
+        # Thread pool for the site simulations, created on first run and kept across runs
+        self._pool = None
+        # Background thread copying outputs to another file system (started on first use), and its pending copies
+        self._mover = None
+        self._mover_lock = threading.Lock()
+        self._pending_moves = []
+
         # Capture exit signals and clean up cache
-        self._finalizer = finalize(self, self.cache_cleanup)
+        self._finalizer = finalize(self, self._cleanup)
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
-        signal.signal(signal.SIGBREAK, self._signal_handler)
+        if hasattr(signal, 'SIGBREAK'):  # Windows only
+            signal.signal(signal.SIGBREAK, self._signal_handler)
 
     def _signal_handler(self, signum, frame):
         '''Clean up cache while exiting'''
@@ -88,10 +172,42 @@ class Workspace:
         exit(0)
     
     def cache_cleanup(self):
+        '''Close worker pool and delete cache, only the first call has any effect'''
+        # The finalizer runs its callback at most once, also at interpreter exit
+        self._finalizer()
+
+    def _cleanup(self):
         # Close worker pool and delete cache
         # WorkerPool(self.uuid).close()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        # Copies read from the cache, let them finish before it is deleted
+        if self._mover is not None:
+            self._mover.shutdown(wait=True)
         self.model.close()
-        shutil.rmtree(self.cache)
+        try:
+            shutil.rmtree(self.cache, onerror=_force_remove)
+        except FileNotFoundError:
+            pass  # Already cleaned up
+
+    def __getstate__(self):
+        # Locks cannot be pickled or deep-copied (ex: by pygmo for the calibration problem),
+        # a copy starts without buffered rows so they are only written once
+        state = self.__dict__.copy()
+        state['_log_lock'] = None
+        state['_log_buffers'] = {}
+        # The site and mover threads, and the pending copies, stay with this workspace
+        state['_pool'] = None
+        state['_mover'] = None
+        state['_mover_lock'] = None
+        state['_pending_moves'] = []
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._log_lock = threading.Lock()
+        self._mover_lock = threading.Lock()
 
     def logger(self, func):
         """
@@ -109,7 +225,12 @@ class Workspace:
             if result is None: return
             elif not isinstance(result, dict):
                 raise ValueError(f"{func.__name__} must return a dictionary.")
-            self.data_logger.log_dict(func.__name__, {'SiteID': site.site_id, **result})
+            with self._log_lock:
+                rows = self._log_buffers.setdefault(func.__name__, [])
+                rows.append({'SiteID': site.site_id, **result})
+                if len(rows) < self._LOG_BATCH_SIZE: return result
+                self._log_buffers[func.__name__] = []
+            self.data_logger.log_dict_batch(func.__name__, rows)
             return result
 
         self.routines[func.__name__] = wrapper
@@ -157,8 +278,16 @@ class Workspace:
         Returns:
             pandas.DataFrame: DataFrame containing the logs for the specified function.
         """
+        self.flush_logs()
         return self.data_logger.get(func)
 
+    def flush_logs(self):
+        """Write the rows buffered by logger routines."""
+        with self._log_lock:
+            buffers, self._log_buffers = self._log_buffers, {}
+        for func_name, rows in buffers.items():
+            self.data_logger.log_dict_batch(func_name, rows)
+
     def run_simulation(self, site_or_info):
         """
         Run simulation for a given site or site information.
@@ -181,20 +310,66 @@ class Workspace:
         # dst_dir = model_pool.acquire()
         # try:
             # Run the model and routines for the site
-        self.model.run(site)
+        self.model.run(site, timeout=self._timeout)
         # finally:
             # Release the worker back to the model pool
             # model_pool.release(dst_dir)
         # Post Process Simulation outcomes
         results = self.post_process(site)
         # Handle output files
+        delete_outputs = self._output_dir is None or (self.routines and self.delete_after_use)
         for out_path in site.outputs.values():
-            if self.config['output_dir'] is None or (self.routines and self.delete_after_use):
+            if delete_outputs:
                 os.remove(out_path)
             else:
-                dst = os.path.join(self.config['output_dir'], os.path.basename(out_path))
-                shutil.move(out_path, dst)
+                dst = os.path.join(self._output_dir, os.path.basename(out_path))
+                if os.path.abspath(out_path) == dst: continue
+                try:
+                    os.replace(out_path, dst)
+                except OSError:
+                    # Different file systems, copy in the background so this worker can start the next site
+                    self._pending_moves.append(self._submit_move(out_path, dst))
         return results
+
+    def _run_sites(self, group):
+        """
+        Run simulations for a list of sites one after another.
+
+        Args:
+            group (list): (info, Site) pairs to simulate in order.
+
+        Returns:
+            list: (info, exception or None) for each site.
+        """
+        outcomes = []
+        for info, site in group:
+            try:
+                self.run_simulation(site)
+                outcomes.append((info, None))
+            except Exception as exc:
+                outcomes.append((info, exc))
+        return outcomes
+
+    def _load_run_settings(self):
+        """Copy the config values read for every site into attributes, refreshed at the start of each run."""
+        output_dir = self.config['output_dir']
+        self._output_dir = os.path.abspath(output_dir) if output_dir is not None else None
+        self._timeout = self.config['timeout']
+
+    def _submit_move(self, src, dst):
+        """Hand a move to the background mover thread, starting it on first use."""
+        with self._mover_lock:
+            if self._mover is None:
+                self._mover = ThreadPoolExecutor(max_workers=1, thread_name_prefix='epic-mover')
+            return self._mover.submit(shutil.move, src, dst)
+
+    def _wait_for_moves(self):
+        """Wait until the outputs handed to the background mover are in output_dir."""
+        pending, self._pending_moves = self._pending_moves, []
+        for future in pending:
+            exc = future.exception()
+            if exc is not None:
+                print(f'\nMoving output failed: {exc}\n')
                     
 
     def run(self, select_str = None, progress_bar = True):
@@ -207,40 +382,59 @@ class Workspace:
         Returns:
             Any: The result of the objective function if set, otherwise None.
         """
+        self._load_run_settings()
         # Warn if outputs wont be saved
-        if self.config['output_dir'] is None or (self.routines and self.delete_after_use):
+        if self._output_dir is None or (self.routines and self.delete_after_use):
             if progress_bar:
                 print("Warning: Output files won't be saved")
 
         # Use provided select string or default from config
         select_str = select_str or self.config["select"]
         # Load and filter run information
-        info = filter_dataframe(pd.read_csv(self.run_info), select_str)
-        info_ls = info.to_dict('records')
+        info = filter_dataframe(self._run_info_df, select_str)
+        # Rows are turned into records one at a time, instead of materializing all of them first
+        columns, total = list(info.columns), len(info)
+        records = (dict(zip(columns, row)) for row in info.itertuples(index=False, name=None))
 
         # Run first simulation for error check, if progress bar is enabled
-        if progress_bar: self.run_simulation(info_ls.pop(0))
-        temp = self.model._model_lock
-        self.model._model_lock = None
-        # Execute simulations in parallel
-        # if __name__ == '__main__':
-        # parallel_executor(
-        #     self.run_simulation, 
-        #     info_ls, 
-        #     method='Thread',
-        #     max_workers=self.config["num_of_workers"],
-        #     timeout=self.config["timeout"],
-        #     bar=int(progress_bar),
-        # )
-        # Sequential execution as fallback
-        for info in info_ls:
-            start_time = time.time()
-            if self.config["timeout"]:
-                if time.time() - start_time > self.config["timeout"]:
-                    print(f"Timeout for {info}")
-                    continue
-            self.run_simulation(info)
-        self.model._model_lock = temp
+        if progress_bar: self.run_simulation(next(records))
+        # Build the sites in one pass here rather than inside the worker threads
+        sites = []
+        for info in records:
+            try:
+                sites.append((info, Site.from_config(self.config, **info)))
+            except Exception as exc:
+                print(f'\nExecution failed for args:\n {info}')
+                print(f'Exception: {exc}\n')
+        # Execute simulations in parallel. Threads are used rather than processes: EPIC runs in a
+        # subprocess so the GIL is released while waiting on it, and routines are closures over the
+        # workspace (logger, model) that could not be sent to a process pool.
+        # Timeouts are enforced by the model, which terminates runs taking too long
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.config["num_of_workers"], thread_name_prefix='epic')
+        # Rows sharing a SiteID share the run directory, log and output names, so they are run one
+        # after another on the same worker, in the order of the info file
+        groups = OrderedDict()
+        for info, site in sites:
+            groups.setdefault(site.site_id, []).append((info, site))
+        futures = [self._pool.submit(self._run_sites, group) for group in groups.values()]
+        pbar = tqdm(total=total, initial=total - len(sites)) if progress_bar else None
+        try:
+            for future in as_completed(futures):
+                for info, exc in future.result():
+                    if exc is not None:
+                        print(f'\nExecution failed for args:\n {info}')
+                        print(f'Exception: {exc}\n')
+                    if pbar: pbar.update(1)
+        except KeyboardInterrupt:
+            print("\nKeyboardInterrupt caught, canceling remaining operations...")
+            for future in futures:
+                future.cancel()
+            raise
+        finally:
+            if pbar: pbar.close()
+        self._wait_for_moves()
+        self.flush_logs()
 
         # Return result of objective function if defined, else None
         return self.objective_function() if self.objective_function else None
@@ -255,6 +449,8 @@ class Workspace:
         Returns:
             dict: A dictionary with function names as keys and their returned values as values.
         """
+        # No thread pool needed when there is nothing to run
+        if not self.routines: return {}
         evaluate = lambda func: func(site)
         results = parallel_executor(
             evaluate, 
@@ -311,13 +507,8 @@ class Workspace:
         
         import pygmo as pg
         
-        # Temporarily disable model lock to allow problem creation
-        temp = self.model._model_lock
-        self.model._model_lock = None
         # Create pygmo problem instance
         prob = pg.problem(PygmoProblem(self, *dfs))
-        # Restore original model lock
-        self.model._model_lock = temp
         # Return the problem instance, not the lock
         return prob
         
@@ -333,30 +524,21 @@ class Workspace:
         Raises:
             ValueError: If the file format is unsupported or required columns are missing.
         """
-        if file_path.lower().endswith('.csv'):
-            data = pd.read_csv(file_path)
-            required_columns_csv = {'SiteID', 'soil', 'opc', 'dly', 'lat', 'lon'}
-            if not required_columns_csv.issubset(set(data.columns)):
-                raise ValueError("CSV file missing one or more required columns: 'SiteID', 'soil', 'opc', 'dly', 'lat', 'lon'")
-        elif file_path.lower().endswith('.shp'):
-            data = gpd.read_file(file_path)
-            data = data.to_crs(epsg=4326)  # Convert to latitude and longitude projection
-            data['lat'] = data.geometry.centroid.y
-            data['lon'] = data.geometry.centroid.x
-            required_columns_shp = {'SiteID', 'soil', 'opc', 'dly'}
-            if not required_columns_shp.issubset(set(data.columns)):
-                raise ValueError("Shapefile missing one or more required attributes: 'SiteID', 'soil', 'opc', 'dly'")
-            data.drop(columns=['geometry'], inplace=True)
-        else:
-            raise ValueError("Unsupported file format. Please provide a '.csv' or '.shp' file.")
-        
+        data = _load_sites_info(file_path)
+
         # Check for OPC files
-        opc_files = glob(f'{self.config["opc_dir"]}/*.OPC')
-        present = [os.path.basename(f).split('.')[0] for f in opc_files]
+        # Single directory listing without per-entry stats, matching like glob('*.OPC') did
+        opc_ext = os.path.normcase('.OPC')
+        with os.scandir(self.config["opc_dir"]) as entries:
+            present = frozenset(entry.name.split('.')[0] for entry in entries
+                                if os.path.normcase(entry.name).endswith(opc_ext) and not entry.name.startswith('.'))
 
         # Filter data to include only rows where 'opc' value has a corresponding .OPC file
         initial_count = len(data)
-        data = data.loc[data['opc'].astype(str).isin(present)]
+        opc = data['opc']
+        if opc.dtype != object:
+            opc = opc.astype(str)
+        data = data.loc[opc.isin(present)]
         final_count = len(data)
 
         # Check if the count of valid OPC files is less than the initial count of data entries
@@ -364,6 +546,8 @@ class Workspace:
             missing_count = initial_count - final_count
             warning_msg = f"Warning: {missing_count} sites will not run due to missing .OPC files."
             warnings.warn(warning_msg, RuntimeWarning)
+        # Kept in memory for run(), the CSV copy is only written for inspection
+        self._run_info_df = data.reset_index(drop=True)
         path = os.path.join(self.cache, "info.csv")
         data.to_csv(path, index = False)
         self.run_info = path
\ No newline at end of file
@@ -1,5 +1,6 @@
 import numpy as np
 import pandas as pd
+from functools import lru_cache, partial
 from ruamel.yaml import YAML
 from concurrent.futures import ThreadPoolExecutor
 from shapely.geometry import Polygon, MultiPolygon
@@ -10,12 +11,37 @@ from geoEpic.gee.initialize import ee_Initialize
 
 pool = ee_Initialize()
 
-def extract_features(collection, aoi, date_range, resolution):
+# Reducers shared by all requests, so identical expressions can be served from Earth Engine's cache
+_POINT_REDUCER = ee.Reducer.first()
+_AREA_REDUCER = ee.Reducer.mode()
+
+# Result of a request without any image, typed like the frames of extract_features
+_EMPTY = pd.DataFrame({'Date': pd.Series(dtype='datetime64[ns]')})
+
+
+@lru_cache(maxsize=2048)
+def _geometry(coords):
+    """Build the ee.Geometry for a tuple of coordinates, reused for repeated AOIs."""
+    if len(coords) == 1:
+        return ee.Geometry.Point(list(coords[0])), _POINT_REDUCER
+    return ee.Geometry.Polygon([list(xy) for xy in coords]), _AREA_REDUCER
+
+
+def _to_aoi(aoi_coords):
+    """Convert AOI coordinates to an ee.Geometry and the reducer matching its type."""
+    if isinstance(aoi_coords, (Polygon, MultiPolygon)):
+        aoi_coords = aoi_coords.exterior.coords[:]
+    return _geometry(tuple(tuple(xy) for xy in aoi_coords))
+
+
+def extract_features(collection, aoi, date_range, resolution, reducer=None):
+    # Callers knowing the AOI type pass the reducer, saving a request to the server
+    if reducer is None:
+        reducer = _AREA_REDUCER if aoi.getInfo()['type'] != "Point" else _POINT_REDUCER
 
     def map_function(image):
         # Function to reduce image region and extract data
-        date = image.date().format()
-        reducer = ee.Reducer.mode() if aoi.getInfo()['type'] != "Point" else ee.Reducer.first()
+        date = image.date().format('YYYY-MM-dd')
         reduction = image.reduceRegion(reducer=reducer, geometry=aoi, scale=resolution, maxPixels=1e9)
         return ee.Feature(None, reduction).set('Date', date)
     
@@ -32,10 +58,12 @@ def extract_features(collection, aoi, date_range, resolution):
     finally: 
         pool.release(worker)
 
-    if not df.empty:
-        df['Date'] = pd.to_datetime(df['Date']).dt.date
-        if 'geo' in df.columns: df = df.drop(columns=['geo'])
-        df = df.dropna(how='all', subset=[col for col in df.columns if col != 'Date'])
+    if df.empty:
+        return _EMPTY.copy()
+    # Fixed ISO format parses without inference, datetime64 keeps later groupbys vectorized
+    df['Date'] = pd.to_datetime(df['Date'], format='%Y-%m-%d', cache=True)
+    if 'geo' in df.columns: df = df.drop(columns=['geo'])
+    df = df.dropna(how='all', subset=[col for col in df.columns if col != 'Date'])
     return df
 
 def apply_formula(image, var, formula, vars = None):
@@ -51,6 +79,14 @@ def apply_formula(image, var, formula, vars = None):
     except Exception as e:
         print(f"Error processing image {image.id()}: {e}")
         return image
+
+def apply_formulas(image, formulas, vars = None):
+    """
+    Apply several formulas to an Earth Engine image in order, so a formula can use the bands added before it.
+    """
+    for var, formula in formulas.items():
+        image = apply_formula(image, var, formula, vars)
+    return image
                     
 class CompositeCollection:
     """
@@ -69,7 +105,8 @@ class CompositeCollection:
         # Initialize the CompositeCollection object
         self.global_scope = None
         with open(yaml_file, 'r') as file:
-            self.config = YAML().load(file)
+            # Read-only config, the safe loader is faster (C based when libyaml is available)
+            self.config = YAML(typ='safe').load(file)
         self.global_scope = self.config.get('global_scope')
         self.collections_config = self.config.get('collections')
         self.collections = {}
@@ -106,13 +143,12 @@ class CompositeCollection:
                 def mask_util(image):
                     mask = image.expression(mask_exp)
                     return image.updateMask(mask)
-                collection = collection.map(lambda image: mask_util(image))
+                collection = collection.map(mask_util)
                 
-            variables = config['variables']
-            vars = []
-            for var, formula in variables.items():
-                collection = collection.map(lambda x: apply_formula(x, var, formula))
-                vars.append(var)
+            # All formulas are applied in a single map instead of one map per variable
+            variables = dict(config['variables'])
+            collection = collection.map(partial(apply_formulas, formulas=variables))
+            vars = list(variables)
             
             self.collections[name] = collection.select(vars)
             self.vars[name] = vars
@@ -125,6 +161,20 @@ class CompositeCollection:
         Returns:
             ee.ImageCollection: A merged collection containing all images from all collections.
         """
+        merged_collection = self._merge_collections()
+        
+        try:
+            # Apply derived variables formulas if specified in the configuration
+            derived = self.config.get('derived_variables')
+            vars = merged_collection.first().bandNames().getInfo()
+            merged_collection = merged_collection.map(partial(apply_formulas, formulas=derived, vars=vars))
+        except Exception as e:
+            print(e)
+
+        return merged_collection
+
+    def _merge_collections(self):
+        """Merge the collections, each already filtered to its own time range, into one ImageCollection."""
         if not self.collections:
             raise ValueError("No collections to merge. Make sure collections are initialized.")
 
@@ -135,58 +185,45 @@ class CompositeCollection:
         merged_collection = collection_list[0]
         for collection in collection_list[1:]:
             merged_collection = merged_collection.merge(collection)
-        
-        try:
-            # Apply derived variables formulas if specified in the configuration
-            derived = self.config.get('derived_variables')
-            vars = merged_collection.first().bandNames().getInfo()
-            for var, formula in derived.items():
-                merged_collection = merged_collection.map(lambda x: apply_formula(x, var, formula, vars))
-        except Exception as e:
-            print(e)
-
         return merged_collection
         
-    def extract(self, aoi_coords):
+    def extract(self, aoi_coords, batched=True):
         """
         Extracts temporal data for a given Area of Interest (AOI).
 
         Args:
             aoi_coords (tuple/list): Coordinates representing the AOI, either as a Point or as vertices of a Polygon.
+            batched (bool, optional): Fetch all collections with a single Earth Engine request. If False, one
+                request is made per collection in parallel. Defaults to True.
 
         Returns:
             pd.DataFrame: A pandas DataFrame containing the extracted data.
         """
         # Convert coordinates to AOI geometry
-        if isinstance(aoi_coords, (Polygon, MultiPolygon)):
-            aoi_coords = aoi_coords.exterior.coords[:]
-        if len(aoi_coords) == 1:
-            aoi = ee.Geometry.Point(aoi_coords[0])
+        aoi, reducer = _to_aoi(aoi_coords)
+
+        if batched:
+            # Each collection is already limited to its own time range, the request covers all of them
+            # Dates may be strings or dates depending on the configuration, both compare as ISO strings
+            date_range = (min((args[2][0] for args in self.args), key=str),
+                          max((args[2][1] for args in self.args), key=str))
+            results = [extract_features(self._merge_collections(), aoi, date_range, self.resolution, reducer)]
         else:
-            aoi = ee.Geometry.Polygon(aoi_coords)
-        
-        def extract_features_wrapper(args):
-            name, collection, date_range = args
-            return extract_features(collection, aoi, date_range, self.resolution)
-        
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            results = list(executor.map(extract_features_wrapper, self.args))
+            def extract_features_wrapper(args, aoi=aoi, reducer=reducer):
+                name, collection, date_range = args
+                return extract_features(collection, aoi, date_range, self.resolution, reducer)
+
+            with ThreadPoolExecutor(max_workers=10) as executor:
+                results = list(executor.map(extract_features_wrapper, self.args))
 
         #filter results
         results = [df for df in results if not df.empty]
-        # Merge the results into a single DataFrame
-        df_merged = results[0]
-        for df in results[1:]:
-            df_merged = pd.merge(df_merged, df, on='Date', how='outer')
-            columns = df_merged.columns
-            # Iterate over columns to find and calculate the mean for columns with suffixes
-            for col in set(col.rsplit('_', 1)[0] for col in columns if '_' in col):
-                if f"{col}_x" in columns and f"{col}_y" in columns:
-                    df_merged[col] = df_merged[[f"{col}_x", f"{col}_y"]].mean(axis=1)
-                    df_merged.drop(columns=[f"{col}_x", f"{col}_y"], inplace=True)
-        
-        df_merged = df_merged.groupby('Date').mean().reset_index()
-        df_merged.sort_values(by='Date', inplace=True)
+        if not results:
+            return pd.DataFrame(columns=['Date'] + self.global_scope['variables'])
+        # Stack the results and average them per date in one pass, variables found in several
+        # collections are averaged together and missing values are skipped
+        df_merged = pd.concat(results, axis=0, ignore_index=True)
+        df_merged = df_merged.groupby('Date', sort=True, as_index=False).mean(numeric_only=True)
 
         try:
             # Apply derived variables formulas if specified in the configuration
@@ -201,7 +238,10 @@ class CompositeCollection:
         df_merged.dropna(inplace=True)
         df_merged = df_merged.reset_index(drop=True)
         numerical_cols = df_merged.select_dtypes(include=['number']).columns
-        df_merged[numerical_cols] = df_merged[numerical_cols].astype(float).round(3)
+        # Round as one float block instead of casting and rounding column by column
+        block = df_merged[numerical_cols].to_numpy(dtype=float)
+        np.round(block, 3, out=block)
+        df_merged[numerical_cols] = block
 
         return df_merged
     
@@ -217,9 +257,14 @@ class CompositeCollection:
         Returns:
             pd.Series: The result of the evaluated expression.
         """
-        safe_dict = np.__dict__
-        safe_dict.update(df.to_dict(orient='series'))
-        return eval(expression, {"__builtins__": None}, safe_dict)
+        try:
+            # Evaluated in one pass over the columns (with numexpr when installed)
+            return df.eval(expression, local_dict={}, global_dict={})
+        except Exception:
+            # Functions pandas.eval does not support (ex: where), use numpy on a copy of its namespace
+            safe_dict = dict(np.__dict__)
+            safe_dict.update((col, df[col]) for col in df.columns)
+            return eval(expression, {"__builtins__": None}, safe_dict)
 
 
 
@@ -240,16 +285,11 @@ class TimeSeries:
         pd.DataFrame: A pandas DataFrame containing the extracted data.
         """
         # Convert coordinates to AOI geometry
-        if isinstance(aoi_coords, (Polygon, MultiPolygon)):
-            aoi_coords = aoi_coords.exterior.coords[:]
-        if len(aoi_coords) == 1:
-            aoi = ee.Geometry.Point(aoi_coords[0])
-        else:
-            aoi = ee.Geometry.Polygon(aoi_coords)
+        aoi, reducer = _to_aoi(aoi_coords)
 
         if date_range is None:
             date_range = self.date_range
-        df = extract_features(self.collection, aoi, date_range, resolution)
+        df = extract_features(self.collection, aoi, date_range, resolution, reducer)
         return df
 
 
@@ -1,29 +1,52 @@
 import argparse
 import os
 import sys
+from functools import lru_cache
 from core import *
 from geoEpic.utils import parallel_executor
 import geopandas as gpd
 from time import time
 
+try:
+    import pyarrow
+    _CSV_OPTIONS = {'engine': 'pyarrow'}
+except ImportError:
+    _CSV_OPTIONS = {}
 
-def fetch_data(config_file, location, output_path):
+
+def save_data(df, output_path, fmt = 'csv'):
+    if fmt == 'parquet':
+        # Compact binary output, float32 is enough for the values rounded by extract
+        numerical_cols = df.select_dtypes(include=['number']).columns
+        df = df.astype({col: 'float32' for col in numerical_cols})
+        df.to_parquet(output_path, compression='zstd', index=False)
+    else:
+        df.to_csv(output_path, index = False)
+
+def fetch_data(config_file, location, output_path, fmt = 'csv'):
     collection = CompositeCollection(config_file)
     df = collection.extract([location])
-    df.to_csv(f'{output_path}', index = False)
+    save_data(df, output_path, fmt)
+
+@lru_cache(maxsize=None)
+def _get_collection(config_file):
+    # One CompositeCollection per config, shared by all the sites of a batch
+    return CompositeCollection(config_file)
 
 def fetch_data_wrapper(row):
 
     name = row['name']
     output_dir = row['out']
-    if os.path.exists(f'{output_dir}/{name}.csv'):
+    fmt = row.get('format', 'csv')
+    output_path = f'{output_dir}/{name}.{fmt}'
+    if os.path.exists(output_path):
         return
-    collection = CompositeCollection(row['config_file'])
-    df = collection. extract(row['geometry'])
-    df.to_csv(f'{output_dir}/{name}.csv', index = False)
+    collection = _get_collection(os.path.abspath(row['config_file']))
+    df = collection.extract(row['geometry'])
+    save_data(df, output_path, fmt)
         
     
-def fetch_list(config_file, input_data, output_dir):
+def fetch_list(config_file, input_data, output_dir, fmt = 'csv'):
     """
     Fetches soil data based on the input type which could be coordinates, a CSV file, or a shapefile.
 
@@ -31,32 +54,36 @@ def fetch_list(config_file, input_data, output_dir):
         input_data (str): Could be latitude and longitude as a string, path to a CSV file, or path to a shapefile.
         output_dir (str): Directory or file path where the output should be saved.
         raw (bool): Whether to save the results as raw CSV or .SOL file.
+        fmt (str): Output file format, 'csv' or 'parquet'.
     """
 
     if input_data.endswith('.csv'):
-        locations = pd.read_csv(input_data)
+        locations = pd.read_csv(input_data, **_CSV_OPTIONS)
         if 'SiteID' in locations.columns:
             locations['name'] = locations['SiteID']
         elif 'FieldID' in locations.columns:
             locations['name'] = locations['FieldID']
         else:
-            locations['name'] = list(range(len(locations)))
+            locations['name'] = np.arange(len(locations))
         locations['out'] = output_dir
         locations['config_file'] = config_file
-        locations['geometry'] = locations.apply(lambda x: [[x['lon'], x['lat'] ]], axis = 1)
+        locations['format'] = fmt
+        lons, lats = locations['lon'].to_numpy(), locations['lat'].to_numpy()
+        locations['geometry'] = [[[lon, lat]] for lon, lat in zip(lons, lats)]
         locations_ls = locations.to_dict('records')
         parallel_executor(fetch_data_wrapper, locations_ls, max_workers=40)
 
     elif input_data.endswith('.shp'):
-        shapefile = gpd.read_file(input_data)
+        shapefile = gpd.read_file(input_data, engine='pyogrio')
         if 'SiteID' in shapefile.columns:
             shapefile['name'] = shapefile['SiteID']
         elif 'FieldID' in shapefile.columns:
             shapefile['name'] = shapefile['FieldID']
         else:
-            shapefile['name'] = list(range(len(shapefile)))
+            shapefile['name'] = np.arange(len(shapefile))
         shapefile['out'] = output_dir
         shapefile['config_file'] = config_file
+        shapefile['format'] = fmt
         shapefile_ls = shapefile.to_dict('records')
         parallel_executor(fetch_data_wrapper, shapefile_ls, max_workers=40)
     
@@ -68,16 +95,17 @@ def main():
     parser.add_argument('config_file', help='Path to the configuration file')
     parser.add_argument('--fetch', metavar='INPUT', nargs='+', help='Latitude and longitude as two floats, or a file path')
     parser.add_argument('--out', default='./', dest='output_path', help='Output directory or file path for the fetched data')
+    parser.add_argument('--format', default='csv', choices=['csv', 'parquet'], help='Output file format (parquet requires pyarrow)')
 
     args = parser.parse_args()
     
     try:
         if len(args.fetch) == 2:
             latitude, longitude = map(float, args.fetch)
-            fetch_data(args.config_file, [longitude, latitude ], args.output_path)
+            fetch_data(args.config_file, [longitude, latitude ], args.output_path, args.format)
             print(f'Data saved in {args.output_path}')
         else:
-            fetch_list(args.config_file, args.fetch[0], args.output_path)
+            fetch_list(args.config_file, args.fetch[0], args.output_path, args.format)
     except Exception as e:
         print(e)
         parser.print_help()
@@ -1,13 +1,54 @@
 from geoEpic.io.config_parser import ConfigParser
 import os
-import urllib.request
+import time
 import platform
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 
 home_dir = os.path.expanduser("~")
 metadata_dir = os.path.join(home_dir, 'GeoEPIC')
 root_path = os.path.dirname(__file__)
 
+
+def _download(session, file_url, filename, retries=4, chunk_size=1 << 20):
+    """
+    Stream a file to disk, resuming from a partial '.part' file when one exists.
+    """
+    if os.path.exists(filename):
+        print(f"'{filename}' already exists, skipping download.")
+        return
+    part = filename + '.part'
+    for attempt in range(retries + 1):
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        # identity encoding keeps byte offsets valid for Range requests
+        headers = {'Accept-Encoding': 'identity'}
+        if offset:
+            headers['Range'] = f'bytes={offset}-'
+        try:
+            with session.get(file_url, headers=headers, stream=True, timeout=60) as response:
+                if offset and response.status_code == 416:
+                    break  # partial file is already complete
+                response.raise_for_status()
+                # a 200 means the server ignored the range, so start over
+                mode = 'ab' if response.status_code == 206 else 'wb'
+                with open(part, mode) as f:
+                    for chunk in response.iter_content(chunk_size):
+                        f.write(chunk)
+            break
+        except requests.RequestException:
+            if attempt == retries:
+                raise
+            time.sleep(2 ** attempt)
+    os.replace(part, filename)
+
+
 def setup_metadata():
+    """
+    Download the metadata files that are not yet in the metadata directory.
+    The files are fetched at the same time by up to 6 threads sharing one requests.Session,
+    so they may finish in any order.
+    """
     if not os.path.exists(metadata_dir):
         os.makedirs(metadata_dir)
     
@@ -25,13 +66,14 @@ def setup_metadata():
             "https://smarslab-files.s3.amazonaws.com/epic-utils/redis_win_license",
         ]
         
-    # Download the files to the metadata directory if they don't already exist
-    for file_url in files_to_download:
-        filename = os.path.join(metadata_dir, os.path.basename(file_url))
-        if not os.path.exists(filename):
-            urllib.request.urlretrieve(file_url, filename)
-        else:
-            print(f"'{filename}' already exists, skipping download.")
+    # Download the files to the metadata directory if they don't already exist;
+    # the downloads are independent, so fetch them concurrently
+    pairs = [(file_url, os.path.join(metadata_dir, os.path.basename(file_url)))
+             for file_url in files_to_download]
+    with requests.Session() as session:
+        session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=6))
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            list(executor.map(lambda pair: _download(session, *pair), pairs))
 
 
 def update_template_config_file():
@@ -42,7 +84,9 @@ def update_template_config_file():
                     'site': {'elevation': f'{metadata_dir}/SRTM_1km_US_project.tif',
                              'slope': f'{metadata_dir}/slope_us.tif',
         }, })
-    
-setup_metadata()
-update_template_config_file()
 
+
+if __name__ == '__main__':
+    # Run by `geo_epic init`, importing the module does not download anything
+    setup_metadata()
+    update_template_config_file()
@@ -1,37 +1,87 @@
 from ruamel.yaml import YAML
 import os
+import copy
+
+# Parsed config files keyed by absolute path, as (mtime_ns, size, data)
+_CONFIG_CACHE = {}
 
 class ConfigParser:
 
     def __init__(self, config_path):
         self.config_path = config_path
         self.dir = os.path.dirname(os.path.abspath(config_path))
-        self.yaml = YAML()
-        self.yaml.preserve_quotes = True
-        self.yaml.indent(sequence=4, offset=2)
+        self._dir_prefix = os.path.join(self.dir, '')
+        self._yaml = None
+        self._resolved = None
         self.config_data = self.load()
 
+    @property
+    def yaml(self):
+        """Round-trip YAML instance, only created when the file is written."""
+        if self._yaml is None:
+            self._yaml = YAML()
+            self._yaml.preserve_quotes = True
+            self._yaml.indent(sequence=4, offset=2)
+        return self._yaml
+
     def _update_relative_paths(self, data):
-        """Recursively update paths starting with './' in the data."""
+        """Recursively update paths starting with './' in the data, copying only the dicts that change."""
         if isinstance(data, str) and data.startswith('./'):
-            data = os.path.join(self.dir, data[2:])
-            return data
+            return self._dir_prefix + data[2:]
         if isinstance(data, dict):
-            data = data.copy()
+            updated = None
             for key, value in data.items():
-                    data[key] = self._update_relative_paths(value)
+                new_value = self._update_relative_paths(value)
+                if new_value is not value:
+                    if updated is None:
+                        updated = data.copy()
+                    updated[key] = new_value
+            if updated is not None:
+                return updated
         return data
 
+    def _resolved_data(self):
+        """Config data with relative paths resolved, computed once until the next update."""
+        if self._resolved is None:
+            self._resolved = self._update_relative_paths(self.config_data)
+        return self._resolved
+
     def load(self):
-        """Load data from the YAML file."""
-        with open(self.config_path, 'r') as file:
-            data = self.yaml.load(file)
-        return data
+        """Load data from the YAML file, parsing it again only when the file has changed."""
+        path = os.path.abspath(self.config_path)
+        st = os.stat(path)
+        cached = _CONFIG_CACHE.get(path)
+        if cached is None or cached[:2] != (st.st_mtime_ns, st.st_size):
+            # Reading only needs plain data, the safe loader uses libyaml when it is installed
+            with open(path, 'r') as file:
+                data = YAML(typ='safe').load(file)
+            cached = (st.st_mtime_ns, st.st_size, data)
+            _CONFIG_CACHE[path] = cached
+        # Each parser gets its own copy, update() modifies it in place
+        return copy.deepcopy(cached[2])
 
     def save(self):
-        """Save data to the YAML file."""
+        """Save data to the YAML file, keeping the comments and quoting of the existing file."""
+        with open(self.config_path, 'r') as file:
+            data = self.yaml.load(file)
+        data = self._merge(data, self.config_data)
         with open(self.config_path, 'w') as file:
-            self.yaml.dump(self.config_data, file)
+            self.yaml.dump(data, file)
+        # A same-size write can keep the mtime on coarse filesystems, drop the parsed copy
+        _CONFIG_CACHE.pop(os.path.abspath(self.config_path), None)
+
+    def _merge(self, target, source):
+        """Make the round-trip data target equal to source, only replacing the values that differ."""
+        if not isinstance(target, dict) or not isinstance(source, dict):
+            return source
+        for key in [key for key in target if key not in source]:
+            del target[key]
+        for key, value in source.items():
+            if isinstance(value, dict) and isinstance(target.get(key), dict):
+                self._merge(target[key], value)
+            elif key not in target or target[key] != value:
+                target[key] = value
+        return target
 
     def _recursive_update(self, data, updates):
         """Recursively update dictionary values."""
@@ -45,16 +95,20 @@ class ConfigParser:
     def update(self, updates):
         """Update the current config with new values."""
         self.config_data = self._recursive_update(self.config_data, updates)
+        self._resolved = None
         self.save()
 
     def get(self, key, default=None):
-        """Retrieve a value from the configuration."""
-        data = self.config_data.get(key, default)
-        return self._update_relative_paths(data)
+        """Retrieve a copy of a value from the configuration."""
+        resolved = self._resolved_data()
+        if key in resolved:
+            # Callers may change the result without altering the resolved data
+            return copy.deepcopy(resolved[key])
+        return self._update_relative_paths(default)
     
     def as_dict(self):
-        data = self._update_relative_paths(self.config_data)
-        return data
+        """Return a copy of the configuration with relative paths resolved."""
+        return copy.deepcopy(self._resolved_data())
     
     def __getitem__(self, key):
         return self.get(key, None)
@@ -1,8 +1,23 @@
 import os
+import io
 import numpy as np
 import pandas as pd
 
 
+def _read_fixed_width(path, widths, skiprows=0):
+    """
+    Read a fixed width file with a header row, like pd.read_fwf but parsed by the C engine of read_csv.
+    """
+    offsets = np.cumsum([0] + widths).tolist()
+    bounds = list(zip(offsets[:-1], offsets[1:]))
+    with open(path, 'r') as file:
+        lines = file.read().splitlines()[skiprows:]
+    # Cut every line at the column bounds once, read_csv then does the type conversion in C
+    rows = ['\t'.join(line[start:stop].strip() for start, stop in bounds)
+            for line in lines if line.strip()]
+    return pd.read_csv(io.StringIO('\n'.join(rows)), sep='\t')
+
+
 class CropCom:
     """
     Class for handling CROPCOM.DAT file.
@@ -18,10 +33,15 @@ class CropCom:
         wd = [5, 5] + [8] * 58 + [50]
         if not path.endswith('.DAT'): 
           path = os.path.join(path, 'CROPCOM.DAT')
-        self.data = pd.read_fwf(path, widths=wd, skiprows=1)
+        self.data = _read_fixed_width(path, wd, skiprows=1)
+        # Parameters are floats whether or not the file writes them with a decimal point
+        params = self.data.columns[2:-1]
+        self.data[params] = self.data[params].astype(float)
         self.path = path
         with open(path, 'r') as file:
             self.header = [file.readline() for _ in range(2)]
+            # Saved back with the line endings of the loaded file
+            self.newline = '\r\n' if file.newlines == '\r\n' else '\n'
         self.name = 'CROPCOM'
         self.prms = None
         self.original_columns = self.data.columns.tolist()
@@ -30,24 +50,30 @@ class CropCom:
         self._split_integer_decimal()
 
     def _split_integer_decimal(self):
-        for col in self.split_columns:
-            int_col = col + '_v1'
-            dec_col = col + '_v2'
-            self.data[int_col] = np.floor(self.data[col])
-            self.data[dec_col] = (self.data[col] - self.data[int_col])*100
-            int_idx = self.data.columns.get_loc(col)
-            self.data.insert(int_idx + 1, dec_col, self.data.pop(dec_col))
-            self.data.insert(int_idx + 1, int_col, self.data.pop(int_col))
+        # Split all the columns in one pass, then place each part right after its column
+        values = self.data[self.split_columns].to_numpy(dtype=float)
+        ints = np.floor(values)
+        decs = (values - ints)*100
+        parts = {}
+        for i, col in enumerate(self.split_columns):
+            parts[col + '_v1'] = ints[:, i]
+            parts[col + '_v2'] = decs[:, i]
+        order = []
+        for col in self.data.columns:
+            order.append(col)
+            if col in self.split_columns:
+                order += [col + '_v1', col + '_v2']
+        parts = pd.DataFrame(parts, index=self.data.index)
+        self.data = pd.concat([self.data, parts], axis=1)[order]
 
     def _combine_integer_decimal(self):
-        data = self.data.copy()
-        for col in self.split_columns:
-            int_col = col + '_v1'
-            dec_col = col + '_v2'
-            data[col] = data[int_col].astype(int) + data[dec_col]/100
-            data.drop(columns=[int_col, dec_col], inplace=True)
-        data = data[self.original_columns]
-        return data
+        ints = self.data[[col + '_v1' for col in self.split_columns]].to_numpy().astype(int)
+        decs = self.data[[col + '_v2' for col in self.split_columns]].to_numpy()
+        combined = ints + decs/100
+        columns = {col: self.data[col] for col in self.original_columns}
+        for i, col in enumerate(self.split_columns):
+            columns[col] = combined[:, i]
+        return pd.DataFrame(columns, index=self.data.index)
 
     @property
     def current(self):
@@ -69,7 +95,7 @@ class CropCom:
         data = self._combine_integer_decimal()
         if not path.endswith('.DAT'): 
           path = os.path.join(path, 'CROPCOM.DAT')
-        with open(path, 'w') as ofile:
+        with open(path, 'w', newline=self.newline) as ofile:
             ofile.write(''.join(self.header))
             fmt = '%5d%5s' + '%8.2f'*11 + '%8.4f' + \
               '%8.2f'*5 + '%8.4f'*3 + '%8.2f'*6 + '%8.4f'*9 + \
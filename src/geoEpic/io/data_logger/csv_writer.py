@@ -46,12 +46,17 @@ class CSVWriter:
                 if os.stat(self.file_path).st_size == 0:
                     self.writer.writerow(self.header)
                     self.headers_written = True
-            # Write the row based on dictionary values
-            self.writer.writerow([kwargs[key] for key in self.header])
+            # Write the row based on dictionary values, keys missing from the row are left empty
+            self.writer.writerow([kwargs.get(key) for key in self.header])
         else:
             # Assume args contains only values in the correct order
             self.writer.writerow(args)
 
+    def write_rows(self, rows):
+        """Write several rows, given as dictionaries, to the CSV file."""
+        for row in rows:
+            self.write_row(**row)
+
     def query_rows(self):
         """Retrieve all rows from the CSV file.
 
@@ -82,6 +82,25 @@ class DataLogger:
         with self.get_writer(func_name) as writer:
             writer.write_row(**result)
 
+    def log_dict_batch(self, func_name, results):
+        """
+        Log several dictionaries of results at once, opening the backend a single time.
+
+        Args:
+            func_name (str): The name of the function to log the data for.
+            results (list of dict): Dictionaries of results to log, in order.
+
+        Raises:
+            ValueError: If any result is not a dictionary.
+        """
+        if not results: return
+        for result in results:
+            if not isinstance(result, dict):
+                raise ValueError(f"{func_name} output must be a dictionary.")
+
+        with self.get_writer(func_name) as writer:
+            writer.write_rows(results)
+
     def get(self, func_name):
         """
         Retrieve logged data using the specified backend.
@@ -32,6 +32,18 @@ class RedisWriter:
         data = json.dumps(kwargs)
         self.client.hset(self.table_name, row_id, data)
 
+    def write_rows(self, rows):
+        """Write several rows to the Redis hash in one round trip."""
+        if not self.connected:
+            raise Exception("Redis is not open. Please call the 'open' method first.")
+        if not rows: return
+
+        # Reserve a block of row ids, then store all the rows at once
+        last_id = self.client.incrby(f"{self.table_name}:counter", len(rows))
+        first_id = last_id - len(rows) + 1
+        mapping = {str(first_id + i): json.dumps(row) for i, row in enumerate(rows)}
+        self.client.hset(self.table_name, mapping=mapping)
+
     def read_row(self, row_id):
         """Read a row from Redis hash."""
         if not self.connected:
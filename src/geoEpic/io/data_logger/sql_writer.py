@@ -19,6 +19,8 @@ class SQLTableWriter:
         self.file_path = file_path
         self.db_path = file_path
         self.table_name = os.path.basename(file_path)
+        # Table names start with a uuid, which may begin with a digit
+        self._table = self._quote(self.table_name)
         self.columns = columns
         self.conn = None
         self.cursor = None
@@ -33,8 +35,8 @@ class SQLTableWriter:
         self.conn = sqlite3.connect(self.db_path)
         self.cursor = self.conn.cursor()
         if self.columns:
-            columns_stmt = ', '.join([f"{col_name} {col_type}" for col_name, col_type in self.columns.items()])
-            self.cursor.execute(f"CREATE TABLE IF NOT EXISTS {self.table_name} ({columns_stmt})")
+            columns_stmt = ', '.join([f"{self._quote(col_name)} {col_type}" for col_name, col_type in self.columns.items()])
+            self.cursor.execute(f"CREATE TABLE IF NOT EXISTS {self._table} ({columns_stmt})")
             self.conn.commit()
             self.initialized = True
         self.cursor.execute("PRAGMA journal_mode=WAL;")
@@ -48,27 +50,65 @@ class SQLTableWriter:
         
         self._execute_with_retry(self._write_row, kwargs)
     
+    def write_rows(self, rows):
+        if self.conn is None or self.cursor is None:
+            raise Exception("Database is not open. Please call the 'open' method first.")
+
+        self._execute_with_retry(self._write_rows, rows)
+
     def get_sqlite_type(self, value):
         return self.TYPE_MAPPING.get(type(value), "BLOB")
 
+    @staticmethod
+    def _quote(name):
+        """Quote a table or column name for use in a statement."""
+        return '"' + str(name).replace('"', '""') + '"'
+
     def _write_row(self, kwargs):
         if not self.initialized:
             # Infer column types from the given arguments
-            columns_with_types = [f"{col} {self.get_sqlite_type(value)}" for col, value in kwargs.items()]
+            columns_with_types = [f"{self._quote(col)} {self.get_sqlite_type(value)}" for col, value in kwargs.items()]
             columns_stmt = ', '.join(columns_with_types)
-            self.cursor.execute(f"CREATE TABLE IF NOT EXISTS {self.table_name} ({columns_stmt})")
+            self.cursor.execute(f"CREATE TABLE IF NOT EXISTS {self._table} ({columns_stmt})")
+            self.initialized = True
+
+        columns = ', '.join(self._quote(col) for col in kwargs.keys())
+        placeholders = ', '.join('?' * len(kwargs))
+        self.cursor.execute(f"INSERT INTO {self._table} ({columns}) VALUES ({placeholders})", tuple(kwargs.values()))
+        self.conn.commit()
+
+    def _write_rows(self, rows):
+        # Rows may have different keys, the table gets the union of them and missing values are NULL
+        values_by_col = {}
+        for row in rows:
+            for col, value in row.items():
+                if values_by_col.get(col) is None:
+                    values_by_col[col] = value
+        # Column types come from the first value that is not None
+        types = {col: self.get_sqlite_type(value) for col, value in values_by_col.items()}
+        columns = list(types)
+        if not self.initialized:
+            columns_stmt = ', '.join(f"{self._quote(col)} {types[col]}" for col in columns)
+            self.cursor.execute(f"CREATE TABLE IF NOT EXISTS {self._table} ({columns_stmt})")
             self.initialized = True
+        # The table may have been created by an earlier batch with fewer columns
+        existing = {info[1] for info in self.cursor.execute(f"PRAGMA table_info({self._table})").fetchall()}
+        for col in columns:
+            if col not in existing:
+                self.cursor.execute(f"ALTER TABLE {self._table} ADD COLUMN {self._quote(col)} {types[col]}")
 
-        columns = ', '.join(kwargs.keys())
-        placeholders = ':' + ', :'.join(kwargs.keys())
-        self.cursor.execute(f"INSERT INTO {self.table_name} ({columns}) VALUES ({placeholders})", kwargs)
+        # One statement and one commit for all the rows
+        columns_stmt = ', '.join(self._quote(col) for col in columns)
+        placeholders = ', '.join('?' * len(columns))
+        values = [tuple(row.get(col) for col in columns) for row in rows]
+        self.cursor.executemany(f"INSERT INTO {self._table} ({columns_stmt}) VALUES ({placeholders})", values)
         self.conn.commit()
 
     def query_rows(self, condition=None, *args, **kwargs):
         return self._execute_with_retry(self._query_rows, condition, *args, **kwargs)
 
     def _query_rows(self, condition, *args, **kwargs):
-        query = f"SELECT * FROM {self.table_name}"
+        query = f"SELECT * FROM {self._table}"
         if condition:
             query += f" WHERE {condition}"
         self.cursor.execute(query, *args, **kwargs)
@@ -83,7 +123,7 @@ class SQLTableWriter:
         self._execute_with_retry(self._delete_table)
 
     def _delete_table(self):
-        self.cursor.execute(f"DROP TABLE IF EXISTS {self.table_name}")
+        self.cursor.execute(f"DROP TABLE IF EXISTS {self._table}")
         self.conn.commit()
 
     def close(self):
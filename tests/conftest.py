@@ -0,0 +1,36 @@
+import os
+import shutil
+import pytest
+import geoEpic
+from geoEpic.core import Site
+
+ASSETS = os.path.join(os.path.dirname(geoEpic.__file__), 'assets', 'workspace_win')
+
+# Stand-in for the EPIC executable, its behaviour is picked by the site ID written to EPICRUN.DAT
+STUB_EPIC = """#!/bin/sh
+read id rest < EPICRUN.DAT
+echo "run $id" >> RTSOIL.DAT
+mkdir -p scratch && echo "$id" > "scratch/$id.tmp"
+case "$id" in
+  slow*) sleep 30 ;;
+  dup*) sleep 0.3 ;;
+  missing*) exit 0 ;;
+esac
+for ext in ACY DGN; do echo "$id" > "$id.$ext"; done
+"""
+
+
+@pytest.fixture
+def workspace_dir(tmp_path):
+    """Copy of the bundled sample workspace, with the EPIC executable replaced by a shell stub."""
+    ws = tmp_path / 'ws'
+    shutil.copytree(ASSETS, ws)
+    (ws / 'model' / 'EPIC1102.exe').write_text(STUB_EPIC)
+    return ws
+
+
+def make_site(ws, site_id='umstead'):
+    """Site on the sample workspace's input files."""
+    return Site(opc=ws / 'opc' / 'files' / 'umstead.OPC', dly=ws / 'weather' / 'NCRDU.DLY',
+                sol=ws / 'soil' / 'files' / 'umstead.SOL', sit=ws / 'sites' / 'umstead.SIT',
+                site_id=site_id)
@@ -0,0 +1,63 @@
+import pytest
+from geoEpic.io import ConfigParser
+
+CONFIG = """\
+# Workspace settings
+EPICModel: ./model/EPIC1102.exe  # executable
+Processed_Info: './info.csv'
+timeout: 30
+weather:
+  dir: ./weather  # daily files
+  offline: true
+output_types:
+  - ACY  # Annual Crop data file
+  - DGN
+"""
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / 'config.yml'
+    path.write_text(CONFIG)
+    return path
+
+
+def test_update_keeps_comments_and_quoting(config_path):
+    config = ConfigParser(str(config_path))
+    config.update({'timeout': 60})
+    text = config_path.read_text()
+    assert text == CONFIG.replace('timeout: 30', 'timeout: 60')
+    assert ConfigParser(str(config_path)).config_data['timeout'] == 60
+
+
+def test_update_merges_nested_dicts(config_path):
+    config = ConfigParser(str(config_path))
+    config.update({'weather': {'offline': False, 'start': '2015-01-01'}})
+    reloaded = ConfigParser(str(config_path))
+    assert reloaded.config_data['weather'] == {'dir': './weather', 'offline': False, 'start': '2015-01-01'}
+    assert reloaded['weather']['dir'] == str(config_path.parent / 'weather')
+    assert '  dir: ./weather  # daily files\n' in config_path.read_text()
+
+
+def test_save_removes_deleted_keys(config_path):
+    config = ConfigParser(str(config_path))
+    del config.config_data['timeout']
+    del config.config_data['weather']['offline']
+    config.update({'output_types': ['ACY']})
+    reloaded = ConfigParser(str(config_path))
+    assert reloaded.config_data == {'EPICModel': './model/EPIC1102.exe', 'Processed_Info': './info.csv',
+                                    'weather': {'dir': './weather'}, 'output_types': ['ACY']}
+    text = config_path.read_text()
+    assert 'timeout' not in text and 'offline' not in text
+    assert text.startswith('# Workspace settings\n')
+    assert "Processed_Info: './info.csv'\n" in text
+
+
+def test_returned_values_are_copies(config_path):
+    config = ConfigParser(str(config_path))
+    config['weather']['offline'] = False
+    config.get('output_types').append('ACM')
+    config.as_dict()['weather']['dir'] = './other'
+    assert config['weather'] == {'dir': str(config_path.parent / 'weather'), 'offline': True}
+    assert config.as_dict()['output_types'] == ['ACY', 'DGN']
+    assert config.config_data['weather']['dir'] == './weather'
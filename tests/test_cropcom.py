@@ -0,0 +1,28 @@
+import os
+import pandas as pd
+import geoEpic
+from geoEpic.io import CropCom
+
+CROPCOM = os.path.join(os.path.dirname(geoEpic.__file__), 'assets', 'workspace_win', 'model', 'CROPCOM.DAT')
+
+
+def test_save_round_trip(tmp_path):
+    cropcom = CropCom(CROPCOM)
+    first, second = str(tmp_path / 'first.DAT'), str(tmp_path / 'second.DAT')
+    cropcom.save(first)
+    reloaded = CropCom(first)
+    pd.testing.assert_frame_equal(reloaded.data, cropcom.data)
+    reloaded.save(second)
+    with open(first, 'rb') as f1, open(second, 'rb') as f2:
+        saved = f1.read()
+        assert f2.read() == saved
+    # Header and line endings are kept from the bundled file
+    with open(CROPCOM, 'rb') as file:
+        original = file.read()
+    assert saved.split(b'\r\n')[:2] == original.split(b'\r\n')[:2]
+    assert saved.count(b'\r\n') == saved.count(b'\n') == len(original.splitlines())
+
+
+def test_save_into_directory(tmp_path):
+    CropCom(CROPCOM).save(str(tmp_path))
+    pd.testing.assert_frame_equal(CropCom(str(tmp_path)).data, CropCom(CROPCOM).data)
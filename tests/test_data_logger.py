@@ -0,0 +1,34 @@
+import numpy as np
+from geoEpic.io import DataLogger
+
+
+def test_sql_batches_with_different_keys(tmp_path):
+    logger = DataLogger(str(tmp_path), backend='sql')
+    logger.log_dict_batch('yields', [{'SiteID': 'a', 'yield': 1.5},
+                                     {'SiteID': 'b'},
+                                     {'SiteID': 'c', 'yield': 2.5, 'biomass': 7.0}])
+    # A later batch adds a column to the existing table
+    logger.log_dict_batch('yields', [{'SiteID': 'd', 'lai': 3}])
+    log = logger.get('yields')
+    assert list(log.columns) == ['SiteID', 'yield', 'biomass', 'lai']
+    assert list(log['SiteID']) == ['a', 'b', 'c', 'd']
+    assert log['yield'].tolist()[::2] == [1.5, 2.5]
+    assert log[['yield', 'biomass']].iloc[1].isna().all()
+    assert log['biomass'].tolist()[2] == 7.0 and log['lai'].tolist()[3] == 3
+
+
+def test_csv_batch_with_missing_keys(tmp_path):
+    logger = DataLogger(str(tmp_path), backend='csv')
+    logger.log_dict_batch('yields', [{'SiteID': 'a', 'yield': 1.5}, {'SiteID': 'b'}])
+    log = logger.get('yields')
+    assert list(log['SiteID']) == ['a', 'b']
+    assert log['yield'].iloc[0] == 1.5 and np.isnan(log['yield'].iloc[1])
+
+
+def test_sql_names_are_quoted(tmp_path):
+    logger = DataLogger(str(tmp_path), backend='sql')
+    # Table names start with the logger's uuid, which may begin with a digit
+    logger.uuid = '7LY7j9GEeKq4zoCtBmAPLE'
+    logger.log_dict('yields', {'SiteID': 'a', 'order': 1})
+    logger.log_dict_batch('yields', [{'SiteID': 'b', 'order': 2}])
+    assert logger.get('yields').to_dict('records') == [{'SiteID': 'a', 'order': 1}, {'SiteID': 'b', 'order': 2}]
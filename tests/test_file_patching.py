@@ -0,0 +1,90 @@
+import mmap
+import pytest
+from geoEpic.core import model as model_module
+from geoEpic.core.model import _replace_fields, _patch_file
+
+# First lines of EPICCONT.DAT (I4 fields) and of its parameter lines (F8.2 fields)
+I4_LINE = "   5 2015   1   1   3 2345   0\r\n"
+F8_LINE = "     .80   370.0    2.00     .00\r\n"
+
+
+@pytest.mark.parametrize("line, updates, expected", [
+    (I4_LINE, {0: '10', 2: '12'}, "  10 2015  12   1   3 2345   0\r\n"),
+    (I4_LINE, {1: '2020'}, "   5 2020   1   1   3 2345   0\r\n"),
+    (I4_LINE, {0: '100', 3: '31'}, " 100 2015   1  31   3 2345   0\r\n"),
+    (F8_LINE, {1: '400.00', 3: '1.50'}, "     .80  400.00    2.00    1.50\r\n"),
+    (F8_LINE, {0: '1234.67'}, " 1234.67   370.0    2.00     .00\r\n"),
+    # Values filling the field width keep a separating space and shift the rest of the line
+    (I4_LINE, {2: '9999'}, "   5 2015 9999   1   3 2345   0\r\n"),
+    (I4_LINE, {0: '1000'}, " 1000 2015   1   1   3 2345   0\r\n"),
+    (F8_LINE, {0: '12345.67'}, " 12345.67   370.0    2.00     .00\r\n"),
+    (I4_LINE, {2: '12345'}, "   5 2015 12345   1   3 2345   0\r\n"),
+    (F8_LINE.replace('\r\n', '\n'), {2: '3.25'}, "     .80   370.0    3.25     .00\n"),
+    ("   5 2015   1", {0: '7'}, "   7 2015   1"),
+])
+def test_replace_fields(line, updates, expected):
+    assert _replace_fields(line, updates) == expected
+
+
+def test_replace_fields_keeps_trailing_whitespace():
+    assert _replace_fields("   1   2   \r\n", {1: '3', 2: '4'}) == "   1   3   \r\n"
+
+
+@pytest.fixture
+def mmap_calls(monkeypatch):
+    """Record the files _patch_file patches in place."""
+    calls, real_mmap = [], mmap.mmap
+
+    def spy(fileno, length, *args, **kwargs):
+        calls.append(fileno)
+        return real_mmap(fileno, length, *args, **kwargs)
+    monkeypatch.setattr(model_module.mmap, 'mmap', spy)
+    return calls
+
+
+def write_lines(path, lines):
+    path.write_bytes(''.join(lines).encode())
+
+
+def test_patch_file_same_length_patches_in_place(tmp_path, mmap_calls):
+    path = tmp_path / 'EPICCONT.DAT'
+    old = [I4_LINE, F8_LINE, "   0   1\r\n"]
+    write_lines(path, old)
+    new = [_replace_fields(I4_LINE, {0: '10'}), F8_LINE, "   0   1\r\n"]
+    _patch_file(str(path), old, new)
+    assert path.read_bytes() == ''.join(new).encode()
+    assert len(mmap_calls) == 1
+
+
+@pytest.mark.parametrize("new", [
+    # A line changes length
+    [_replace_fields(I4_LINE, {2: '12345'}), F8_LINE],
+    # A line is added
+    [I4_LINE, F8_LINE, "   0\r\n"],
+])
+def test_patch_file_rewrites_on_length_change(tmp_path, mmap_calls, new):
+    path = tmp_path / 'EPICCONT.DAT'
+    old = [I4_LINE, F8_LINE]
+    write_lines(path, old)
+    _patch_file(str(path), old, new)
+    assert path.read_bytes() == ''.join(new).encode()
+    assert mmap_calls == []
+
+
+def test_patch_file_rewrites_when_file_changed_size(tmp_path, mmap_calls):
+    path = tmp_path / 'EPICCONT.DAT'
+    old = [I4_LINE, F8_LINE]
+    # The file on disk no longer matches the lines it was read as
+    write_lines(path, old + ["   0\r\n"])
+    new = [_replace_fields(I4_LINE, {0: '10'}), F8_LINE]
+    _patch_file(str(path), old, new)
+    assert path.read_bytes() == ''.join(new).encode()
+    assert mmap_calls == []
+
+
+def test_patch_file_without_old_lines(tmp_path, mmap_calls):
+    path = tmp_path / 'EPICCONT.DAT'
+    write_lines(path, [I4_LINE])
+    _patch_file(str(path), None, [F8_LINE])
+    assert path.read_bytes() == F8_LINE.encode()
+    assert mmap_calls == []
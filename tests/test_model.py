@@ -0,0 +1,106 @@
+import os
+import tempfile
+import pytest
+from geoEpic.core import EPICModel
+from geoEpic.utils import IS_WINDOWS
+from conftest import make_site
+
+pytestmark = pytest.mark.skipif(IS_WINDOWS, reason="the EPIC stub is a shell script")
+
+
+@pytest.fixture
+def model(workspace_dir, tmp_path):
+    model = EPICModel(str(workspace_dir / 'model' / 'EPIC1102.exe'))
+    model.cache_path = str(tmp_path / 'cache')
+    model.setup({'output_dir': str(tmp_path / 'output'), 'log_dir': str(tmp_path / 'log'),
+                 'output_types': ['ACY', 'DGN']})
+    yield model
+    model.close()
+
+
+def test_run_does_not_write_into_template(model, workspace_dir, tmp_path):
+    rtsoil = workspace_dir / 'model' / 'RTSOIL.DAT'
+    before = rtsoil.read_bytes()
+    model.run(make_site(workspace_dir))
+    model.run_batch([make_site(workspace_dir, 'u2'), make_site(workspace_dir, 'u3')], bar=False)
+    assert rtsoil.read_bytes() == before
+    assert (tmp_path / 'output' / 'umstead.DGN').read_text() == 'umstead\n'
+    assert (tmp_path / 'output' / 'u3.ACY').exists()
+
+
+def test_reused_run_dir_starts_clean(model, workspace_dir):
+    model.reuse_run_dirs = True
+    model.run(make_site(workspace_dir, 'u1'))
+    model.run(make_site(workspace_dir, 'u2'))
+    runs_dir = os.path.join(model.cache_path, 'EPICRUNS')
+    run_dirs = os.listdir(runs_dir)
+    assert len(run_dirs) == 1
+    run_dir = os.path.join(runs_dir, run_dirs[0])
+    template = (workspace_dir / 'model' / 'RTSOIL.DAT').read_bytes()
+    with open(os.path.join(run_dir, 'RTSOIL.DAT'), 'rb') as f:
+        assert f.read() == template + b'run u2\n'
+    assert os.listdir(os.path.join(run_dir, 'scratch')) == ['u2.tmp']
+
+
+
+@pytest.mark.parametrize("can_link", [True, False])
+def test_reused_run_dir_picks_up_template_edits(model, workspace_dir, monkeypatch, can_link):
+    if not can_link:
+        # Cache on another file system than the model directory
+        def no_link(src, dst):
+            raise OSError("Invalid cross-device link")
+        monkeypatch.setattr(os, 'link', no_link)
+    model.reuse_run_dirs = True
+    model.run(make_site(workspace_dir, 'u1'))
+    # Saved through a new file, as an editor or a replace would do
+    template = workspace_dir / 'model' / 'CROPCOM.DAT'
+    edited = workspace_dir / 'model' / 'CROPCOM.new'
+    edited.write_bytes(template.read_bytes() + b'edited\r\n')
+    os.replace(edited, template)
+    model.run(make_site(workspace_dir, 'u2'))
+    runs_dir = os.path.join(model.cache_path, 'EPICRUNS')
+    run_dir, = os.listdir(runs_dir)
+    with open(os.path.join(runs_dir, run_dir, 'CROPCOM.DAT'), 'rb') as f:
+        assert f.read() == template.read_bytes()
+
+def test_model_dir_is_held_exclusively(model, workspace_dir):
+    executable = str(workspace_dir / 'model' / 'EPIC1102.exe')
+    with pytest.raises(RuntimeError):
+        EPICModel(executable)
+    model.close()
+    EPICModel(executable).close()
+
+
+def test_run_batch_reports_failed_indices(model, workspace_dir, tmp_path):
+    sites = [make_site(workspace_dir, site_id) for site_id in ('u1', 'slow1', 'missing1', 'u2')]
+    failed = model.run_batch(sites, workers=2, timeout=1, bar=False)
+    assert sorted(failed) == [1, 2]
+    assert sites[0].outputs['ACY'] == str(tmp_path / 'output' / 'u1.ACY')
+    assert (tmp_path / 'output' / 'u2.DGN').read_text() == 'u2\n'
+    # Logs are only kept for the failed runs
+    assert sorted(os.listdir(tmp_path / 'log')) == ['missing1.log', 'slow1.log']
+
+
+def test_run_batch_runs_shared_site_ids_in_turn(model, workspace_dir, tmp_path):
+    sites = [make_site(workspace_dir, 'dup1') for _ in range(3)] + [make_site(workspace_dir, 'u1')]
+    assert model.run_batch(sites, workers=4, bar=False) == []
+    assert all(site.outputs['ACY'] == str(tmp_path / 'output' / 'dup1.ACY') for site in sites[:3])
+
+
+def test_set_output_types_rejects_unknown_types(model, workspace_dir):
+    print_file = workspace_dir / 'model' / model.file_names['FPRNT']
+    before = print_file.read_bytes()
+    with pytest.raises(ValueError, match='XYZ'):
+        model.set_output_types(['ACY', 'XYZ'])
+    assert print_file.read_bytes() == before
+    assert sorted(model._output_types) == ['ACY', 'DGN']
+
+
+def test_run_dirs_are_kept_on_dev_shm(model, workspace_dir):
+    if not os.path.isdir('/dev/shm'):
+        pytest.skip("no /dev/shm")
+    with tempfile.TemporaryDirectory(dir='/dev/shm') as cache_path:
+        model.cache_path = cache_path
+        model.delete_after_run = False
+        model.run(make_site(workspace_dir, 'u1'))
+        assert os.listdir(os.path.join(cache_path, 'EPICRUNS')) == ['u1']
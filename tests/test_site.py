@@ -0,0 +1,25 @@
+import shutil
+from geoEpic.core import site as site_module
+from geoEpic.io import SIT
+from conftest import ASSETS
+
+
+def test_parse_cache_drops_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(site_module, '_PARSE_CACHE', site_module.OrderedDict())
+    monkeypatch.setattr(site_module, '_PARSE_CACHE_SIZE', 2)
+    paths = []
+    for name in 'abc':
+        paths.append(str(tmp_path / f'{name}.SIT'))
+        shutil.copy(f'{ASSETS}/sites/umstead.SIT', paths[-1])
+    a, b, c = paths
+    site_module._load_cached(SIT, a)
+    site_module._load_cached(SIT, b)
+    # A hit makes a the most recently used, so b is dropped for c
+    first = site_module._load_cached(SIT, a)
+    site_module._load_cached(SIT, c)
+    assert [key[1] for key in site_module._PARSE_CACHE] == [a, c]
+    # Every load returns its own copy
+    second = site_module._load_cached(SIT, a)
+    assert second is not first and second.site_info == first.site_info
+    second.site_info['lat'] = -1
+    assert site_module._load_cached(SIT, a).site_info == first.site_info
@@ -1,3 +1,98 @@
+import copy
+import shutil
+import signal
+import pytest
+from geoEpic.core import Workspace
+from geoEpic.core.calibration import PygmoProblem
+from geoEpic.io import CropCom, DataLogger
+from geoEpic.utils import IS_WINDOWS
+
+
 def test_sample():
     assert True==True
 
+
+@pytest.fixture
+def make_workspace(workspace_dir, tmp_path):
+    """Build a workspace on the sample inputs running one row per given SiteID."""
+    handlers = {sig: signal.getsignal(sig) for sig in (signal.SIGINT, signal.SIGTERM)}
+    workspaces = []
+
+    def make(site_ids):
+        with open(workspace_dir / 'config.yml', 'a') as f:
+            f.write('num_of_workers: 4\n')
+        rows = [f'{site_id},35.97,-90.13,umstead,NCRDU,umstead' for site_id in site_ids]
+        (workspace_dir / 'info.csv').write_text('SiteID,lat,lon,soil,dly,opc\n' + '\n'.join(rows) + '\n')
+        for site_id in set(site_ids):
+            shutil.copy(workspace_dir / 'sites' / 'umstead.SIT', workspace_dir / 'sites' / f'{site_id}.SIT')
+        ws = Workspace(str(workspace_dir / 'config.yml'), cache_path=str(tmp_path / 'cache'))
+        workspaces.append(ws)
+        return ws
+
+    yield make
+    for ws in workspaces:
+        ws.cache_cleanup()
+    for sig, handler in handlers.items():
+        signal.signal(sig, handler)
+
+
+@pytest.mark.skipif(IS_WINDOWS, reason="the EPIC stub is a shell script")
+def test_rows_sharing_a_site_id_all_run(make_workspace):
+    ws = make_workspace(['s4', 's4', 'u1', 's4'])
+    ws.data_logger = DataLogger(ws.cache, backend='csv')
+
+    @ws.logger
+    def ran(site):
+        return {'value': 1}
+
+    ws.run(progress_bar=False)
+    log = ws.fetch_log('ran')
+    assert sorted(log['SiteID']) == ['s4', 's4', 's4', 'u1']
+
+
+@pytest.mark.skipif(IS_WINDOWS, reason="the EPIC stub is a shell script")
+@pytest.mark.parametrize("backend", ['csv', 'sql'])
+@pytest.mark.parametrize("batch_size", [2, 256])
+def test_fetch_log_after_run_returns_all_rows(make_workspace, backend, batch_size):
+    site_ids = [f'u{i}' for i in range(5)]
+    ws = make_workspace(site_ids)
+    ws.data_logger = DataLogger(ws.cache, backend=backend)
+    # Two full batches and a partial one, or a single partial batch
+    ws._LOG_BATCH_SIZE = batch_size
+
+    @ws.logger
+    def site_number(site):
+        return {'number': int(site.site_id[1:])}
+
+    ws.run(progress_bar=False)
+    log = ws.fetch_log('site_number').sort_values('SiteID')
+    assert list(log['SiteID']) == site_ids
+    assert [int(n) for n in log['number']] == list(range(5))
+
+
+@pytest.mark.skipif(IS_WINDOWS, reason="the EPIC stub is a shell script")
+def test_workspace_can_be_deep_copied(make_workspace):
+    ws = make_workspace(['u1', 'u2'])
+    copied = copy.deepcopy(ws)
+    assert copied.cache == ws.cache and copied._mover is None
+    copied.run(progress_bar=False)
+    # Also once a run has started the workspace's thread pool
+    ws.run(progress_bar=False)
+    assert ws._pool is not None
+    assert copy.deepcopy(ws)._pool is None
+
+
+@pytest.mark.skipif(IS_WINDOWS, reason="the EPIC stub is a shell script")
+def test_calibration_problem_can_be_deep_copied(make_workspace):
+    ws = make_workspace(['u1'])
+    ws.objective(lambda: 0.0)
+    cropcom = CropCom(ws.model.path)
+    cropcom.set_sensitive(['WA', 'HI'], [1])
+    # pygmo deep-copies the problem it is given, with the workspace it holds
+    problem = copy.deepcopy(PygmoProblem(ws, cropcom))
+    assert problem.fitness(problem.current) == 0.0
+    try:
+        import pygmo as pg
+    except ImportError:
+        return
+    assert isinstance(ws.make_problem(cropcom), pg.problem)